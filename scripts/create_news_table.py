@@ -1,12 +1,12 @@
 import sys
 from pathlib import Path
 
-# Add the src directory to Python path
-project_root = Path(__file__).parent.parent
-src_path = project_root / "src"
-sys.path.insert(0, str(src_path))
+# Add the project root to the path
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
 
-from db_utils import DatabaseSchema
+from src.db_utils import DatabaseSchema
 
 
 def create_news_tables():
@@ -10,8 +10,11 @@ import random
 from datetime import datetime
 
 # Add the project root to the path so we can import project modules
-project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
-sys.path.append(project_root)
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from psycopg2.extras import execute_values
 
 from src.db_utils.db_config import get_db_connection
 
@@ -76,27 +79,52 @@ def create_mock_users():
     # Connect to the database and insert mock users
     with get_db_connection() as conn:
         cursor = conn.cursor()
-        
-        # Check if users already exist to avoid duplicates
-        cursor.execute("SELECT user_email FROM users")
-        existing_emails = [row[0] for row in cursor.fetchall()]
-        
-        # Insert users that don't already exist
-        inserted_count = 0
+
+        # Insert all users in a single multi-row statement; ON CONFLICT lets
+        # Postgres skip the ones that already exist, so no preliminary
+        # SELECT over the users table is needed
+        rows = [(user["email"], user["preferences"], user["age"],
+                 user["gender"], user["location"]) for user in mock_users]
+        execute_values(
+            cursor,
+            """
+            INSERT INTO users (user_email, user_preferences, age, gender, location)
+            VALUES %s
+            ON CONFLICT (user_email) DO NOTHING
+            """,
+            rows,
+            page_size=500
+        )
+        inserted_count = cursor.rowcount
+
+        # Normalize the free-text preference blobs into one topic row per
+        # sentence so recommendation queries can scan short rows instead of
+        # dragging the full text column through the buffer cache
+        cursor.execute("SELECT id, user_email FROM users WHERE user_email = ANY(%s)",
+                       ([user["email"] for user in mock_users],))
+        user_ids_by_email = {email: user_id for user_id, email in cursor.fetchall()}
+
+        preference_rows = []
         for user in mock_users:
-            if user["email"] not in existing_emails:
-                cursor.execute(
-                    """
-                    INSERT INTO users (user_email, user_preferences, age, gender, location)
-                    VALUES (%s, %s, %s, %s, %s)
-                    """,
-                    (user["email"], user["preferences"], user["age"], user["gender"], user["location"])
-                )
-                inserted_count += 1
-                print(f"Inserted user: {user['email']}")
-            else:
-                print(f"User {user['email']} already exists, skipping.")
-        
+            user_id = user_ids_by_email.get(user["email"])
+            if user_id is None:
+                continue
+            topics = [sentence.strip() for sentence in user["preferences"].split('.')
+                      if sentence.strip()]
+            preference_rows.extend((user_id, topic) for topic in topics)
+
+        if preference_rows:
+            execute_values(
+                cursor,
+                """
+                INSERT INTO user_preferences (user_id, topic)
+                VALUES %s
+                ON CONFLICT (user_id, topic) DO NOTHING
+                """,
+                preference_rows,
+                page_size=500
+            )
+
         conn.commit()
         
         print(f"\nSuccessfully inserted {inserted_count} new mock users into the database.")
@@ -143,62 +171,70 @@ def create_article_history_for_primary_user():
             # For pipeline usage, don't prompt for input - just continue
             print("Adding more records to existing history...")
         
-        # Get 10 random articles
+        # Get 10 random articles using a block-level sample, which avoids the
+        # full-table scan and sort that ORDER BY RANDOM() requires. Title,
+        # source and date come along so the summary can print from memory
         cursor.execute("""
-            SELECT id FROM articles 
-            ORDER BY RANDOM() 
+            SELECT id, title, source_uri, date FROM articles
+            TABLESAMPLE SYSTEM (1)
             LIMIT 10
         """)
         random_articles = cursor.fetchall()
+
+        # TABLESAMPLE can return fewer rows than requested on small tables,
+        # so fall back to the exact (slower) sampling in that case
+        if len(random_articles) < 10:
+            cursor.execute("""
+                SELECT id, title, source_uri, date FROM articles
+                ORDER BY RANDOM()
+                LIMIT 10
+            """)
+            random_articles = cursor.fetchall()
         
         if len(random_articles) < 10:
             print(f"Warning: Only found {len(random_articles)} articles in the database.")
         
-        # Insert user-article relations
-        inserted_count = 0
-        for article_row in random_articles:
-            article_id = article_row[0]
-            
-            # Check if relation already exists
-            cursor.execute(
-                "SELECT id FROM user_articles WHERE user_id = %s AND article_id = %s", 
-                (user_id, article_id)
-            )
-            if cursor.fetchone():
+        # Check only the sampled candidates against the user's history in a
+        # single query instead of fetching the whole history
+        candidate_ids = [row[0] for row in random_articles]
+        cursor.execute(
+            "SELECT article_id FROM user_articles WHERE user_id = %s AND article_id = ANY(%s)",
+            (user_id, candidate_ids)
+        )
+        existing_article_ids = {row[0] for row in cursor.fetchall()}
+
+        new_relations = []
+        added_articles = []
+        for row in random_articles:
+            article_id = row[0]
+            if article_id in existing_article_ids:
                 print(f"Article {article_id} is already in user's history, skipping.")
                 continue
-            
-            # Insert the relationship
-            cursor.execute(
-                "INSERT INTO user_articles (user_id, article_id) VALUES (%s, %s)",
-                (user_id, article_id)
+            new_relations.append((user_id, article_id))
+            added_articles.append(row)
+
+        # Insert all new user-article relations in a single multi-row statement
+        if new_relations:
+            execute_values(
+                cursor,
+                "INSERT INTO user_articles (user_id, article_id) VALUES %s ON CONFLICT DO NOTHING",
+                new_relations,
+                page_size=500
             )
-            inserted_count += 1
-        
+        inserted_count = len(new_relations)
+
         conn.commit()
         
         print(f"\nSuccessfully added {inserted_count} articles to {primary_email}'s reading history.")
-        
-        # Verify the total history for the user
-        cursor.execute("SELECT COUNT(*) FROM user_articles WHERE user_id = %s", (user_id,))
-        total_history = cursor.fetchone()[0]
-        print(f"Total articles in user's history: {total_history}")
-        
-        # Display some details about the articles added
-        cursor.execute("""
-            SELECT a.id, a.title, a.source_uri, a.date 
-            FROM articles a
-            JOIN user_articles ua ON a.id = ua.article_id
-            WHERE ua.user_id = %s
-            ORDER BY ua.created_at DESC
-            LIMIT 10
-        """, (user_id,))
-        
-        print("\nRecent articles in user's history:")
-        articles = cursor.fetchall()
-        for i, (id, title, source, date) in enumerate(articles, 1):
+
+        # The summary can be computed from data already in hand - no need to
+        # re-query the history we just wrote
+        print(f"Total articles in user's history: {existing_history_count + inserted_count}")
+
+        print("\nArticles added to user's history:")
+        for i, (id, title, source, date) in enumerate(added_articles, 1):
             print(f"{i}. [{id}] {title} (from {source}, {date})")
-        
+
         return True
 
 
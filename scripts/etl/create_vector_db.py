@@ -11,19 +11,23 @@ from pathlib import Path
 from datetime import datetime, date
 
 # Add the project root to the path
-project_root = Path(__file__).parent.parent
-sys.path.append(str(project_root))
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
 
 from src.llm.vector_store import VectorStore
 
 
-def main(date_str: str = None) -> bool:
+def main(date_str: str = None, full_rebuild: bool = False, index_type: str = None) -> bool:
     """
     Main function to create vector database
-    
+
     Args:
         date_str: Date string in YYYY-MM-DD format (for pipeline usage)
-        
+        full_rebuild: Force a full rebuild instead of an incremental update
+        index_type: FAISS index type ('flat', 'hnsw', 'ivf', 'sq8' or 'pq');
+            defaults to the VECTOR_INDEX_TYPE environment variable or 'flat'
+
     Returns:
         True if vector database creation was successful, False otherwise
     """
@@ -35,23 +39,37 @@ def main(date_str: str = None) -> bool:
                            help='Date in YYYY-MM-DD format')
         parser.add_argument('--full-rebuild', action='store_true',
                            help='Force full rebuild instead of incremental update')
+        parser.add_argument('--index-type', type=str, default=None,
+                           choices=['flat', 'hnsw', 'ivf', 'sq8', 'pq'],
+                           help='FAISS index type (default: VECTOR_INDEX_TYPE env or flat; '
+                                'sq8/pq are quantized)')
         args = parser.parse_args()
         date_str = args.date
+        full_rebuild = args.full_rebuild
+        index_type = args.index_type
+
 
-    
     # Parse the date
     target_date = datetime.strptime(date_str, '%Y-%m-%d').date()
-    
+
     print(f"Creating vector database for date: {target_date}")
-    
+
     # Create vector store
-    vector_store = VectorStore(use_existing_version=True)
-    
-    # Build the vector database
-    vector_store.create_index(incremental=False)
-    
-    print(f"✓ Successfully created vector database for {target_date}")
-    return True
+    vector_store = VectorStore(use_existing_version=True, index_type=index_type)
+
+    # Build the vector database - incremental mode only embeds articles that
+    # are not yet in the index, so daily runs cost O(new articles)
+    try:
+        success = vector_store.create_index(incremental=not full_rebuild)
+    except Exception as e:
+        print(f"❌ Error creating vector database: {str(e)}")
+        return False
+
+    if success:
+        print(f"✓ Successfully created vector database for {target_date}")
+    else:
+        print(f"❌ Failed to create vector database for {target_date}")
+    return success
 
 
 if __name__ == "__main__":
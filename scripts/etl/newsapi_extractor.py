@@ -9,18 +9,25 @@ and save the results to PostgreSQL database.
 import sys
 import os
 import argparse
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from datetime import datetime
+from datetime import date
 from typing import List
 
-# Add the src directory to Python path
-project_root = Path(__file__).parent.parent
-src_path = project_root / "src"
-sys.path.insert(0, str(src_path))
+# Add the project root to the path
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
 
-from etl.api_connector import NewsAPIConnector
-from db_utils import DatabaseOperations
+from src.etl.api_connector import NewsAPIConnector
+from src.db_utils import DatabaseOperations
 
+# Maximum number of concurrent NewsAPI searches
+MAX_CONCURRENT_SEARCHES = 8
+
+# How many completed responses to accumulate before writing them to the
+# database while other searches are still running
+SAVE_BATCH_SIZE = 4
 
 def main(keywords: str = None, count: int = None, dates: str = None) -> List[int]:
     """
@@ -54,70 +61,102 @@ def main(keywords: str = None, count: int = None, dates: str = None) -> List[int
     
     # Parse keywords into a list
     keywords_list = [keyword.strip() for keyword in keywords.split(',')]
-    
-    # Parse dates into a list
-    target_dates = [date.strip() for date in dates.split(',')]
-    
+
+    # Parse dates once up front so malformed input fails before any search
+    # runs, rather than midway through the fan-out
+    target_dates = [date.fromisoformat(d.strip()) for d in dates.split(',')]
+
+    # Request fields shared by every search, built once outside the loops
+    base_request = {
+        "articles_count": count,
+        "articles_sort_by": "date",
+        "ignore_source_group_uri": "paywall/paywalled_sources",
+    }
+
     # Initialize database operations
     db_ops = DatabaseOperations()
     
-    # Initialize connector (replace with your actual API key)
+    # Initialize connector (replace with your actual API key). One connector
+    # is shared by all workers: the session's urllib3 pool is thread-safe,
+    # and sharing the rate limiter keeps the whole fan-out inside a single
+    # request budget instead of one budget per thread
     api_key = os.getenv("NEWSAPI_KEY", "your-newsapi-key-here")
-    
+    connector = NewsAPIConnector(api_key)
+
+
+    total_articles = 0
+    successful_searches = 0
+    total_searches = len(keywords_list) * len(target_dates)
+
+    print(f"Starting search for {len(keywords_list)} keywords across {len(target_dates)} dates...")
+    print(f"Keywords: {', '.join(keywords_list)}")
+    print(f"Dates: {', '.join(d.isoformat() for d in target_dates)}")
+    print(f"Total searches to perform: {total_searches}")
+    print("=" * 50)
+
+    def run_search(keyword: str, target_date: date):
+        """Run one keyword/date search and return the request/response pair."""
+        date_str = target_date.isoformat()
+        print(f"Searching for '{keyword}' articles on {date_str}...")
+
+        # Prepare request data for database
+        search_request = {
+            **base_request,
+            "keyword": keyword,
+            "dateStart": date_str,
+            "dateEnd": date_str,
+        }
+
+        results = connector.search_articles(**search_request)
+
+        articles = results.get('articles', {}).get('results', [])
+        print(f"✓ Found {len(articles)} articles for '{keyword}' on {date_str}")
+        return search_request, results, len(articles)
+
+    # Run all keyword/date combinations concurrently - the searches are
+    # network-bound, so overlapping them cuts wall time to roughly the
+    # slowest request per batch of workers
+    combinations = [(keyword, target_date)
+                    for target_date in target_dates
+                    for keyword in keywords_list]
+
+    # Consume searches as they complete and persist them in small batches
+    # while the remaining searches are still in flight - the searches are
+    # network-bound and the saves are DB-bound, so the two stages overlap
+    # instead of running back to back
     response_ids = []
-        
-    with NewsAPIConnector(api_key) as connector:
-        total_articles = 0
-        successful_searches = 0
-        total_searches = len(keywords_list) * len(target_dates)
-        
-        print(f"Starting search for {len(keywords_list)} keywords across {len(target_dates)} dates...")
-        print(f"Keywords: {', '.join(keywords_list)}")
-        print(f"Dates: {', '.join(target_dates)}")
-        print(f"Total searches to perform: {total_searches}")
-        print("=" * 50)
-        
-        # Loop through each date and keyword combination
-        for date_str in target_dates:
-            for keyword in keywords_list:
-                print(f"\nSearching for '{keyword}' articles on {date_str}...")
-                
-                # Prepare request data for database
-                search_request = {
-                    "keyword": keyword,
-                    "articles_count": count,
-                    "articles_sort_by": "date",
-                    "ignore_source_group_uri": "paywall/paywalled_sources",
-                    "dateStart": date_str,
-                    "dateEnd": date_str,
-                }
-                
-                results = connector.search_articles(**search_request)
-                
-                # Save to database using the new utility
-                record_id = db_ops.save_news_data(search_request, results)
-                if record_id:
-                    print(f"✓ Data saved to database with ID: {record_id}")
-                    response_ids.append(record_id)
-                
-                articles = results.get('articles', {}).get('results', [])
-                article_count = len(articles)
+    pending_saves = []
+    try:
+        with ThreadPoolExecutor(max_workers=min(MAX_CONCURRENT_SEARCHES, total_searches)) as executor:
+            futures = [executor.submit(run_search, keyword, target_date)
+                       for keyword, target_date in combinations]
+            for future in as_completed(futures):
+                search_request, results, article_count = future.result()
+                pending_saves.append((search_request, results))
                 total_articles += article_count
                 successful_searches += 1
-                print(f"✓ Found {article_count} articles for '{keyword}' on {date_str}")
+                if len(pending_saves) >= SAVE_BATCH_SIZE:
+                    response_ids.extend(db_ops.save_news_data_batch(pending_saves))
+                    pending_saves = []
+    finally:
+        connector.close()
+
+    if pending_saves:
+        response_ids.extend(db_ops.save_news_data_batch(pending_saves))
+    if response_ids:
+        print(f"✓ Saved {len(response_ids)} responses to database")
+
+    print("\n" + "=" * 50)
+    print(f"=== SEARCH SUMMARY ===")
+    print(f"Total keywords searched: {len(keywords_list)}")
+    print(f"Total dates searched: {len(target_dates)}")
+    print(f"Successful searches: {successful_searches}/{total_searches}")
+    print(f"Total articles found: {total_articles}")
+    print(f"Average articles per search: {total_articles/successful_searches:.1f}" if successful_searches > 0 else "Average articles per search: 0")
+    print(f"Keywords: {', '.join(keywords_list)}")
+    print(f"Dates: {', '.join(d.isoformat() for d in target_dates)}")
+    print(f"Response IDs created: {response_ids}")
 
-        
-        print("\n" + "=" * 50)
-        print(f"=== SEARCH SUMMARY ===")
-        print(f"Total keywords searched: {len(keywords_list)}")
-        print(f"Total dates searched: {len(target_dates)}")
-        print(f"Successful searches: {successful_searches}/{total_searches}")
-        print(f"Total articles found: {total_articles}")
-        print(f"Average articles per search: {total_articles/successful_searches:.1f}" if successful_searches > 0 else "Average articles per search: 0")
-        print(f"Keywords: {', '.join(keywords_list)}")
-        print(f"Dates: {', '.join(target_dates)}")
-        print(f"Response IDs created: {response_ids}")
-    
     return response_ids
 
 
@@ -16,12 +16,12 @@ from datetime import datetime, timedelta
 import argparse
 
 # Add the project root to the path
-project_root = Path(__file__).parent.parent
-sys.path.append(str(project_root))
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
 
 # Import the modified script functions
 from scripts.etl.newsapi_extractor import main as extract_news
-from scripts.etl.process_response_to_articles import main as process_responses
 from scripts.etl.create_vector_db import main as create_vector_db
 from scripts.etl.create_mock_users import main as create_users
 
@@ -60,22 +60,19 @@ def main():
         return
     
     print(f"✅ Step 1 complete. Extracted {len(response_ids)} response batches.")
-    
-    # Step 2: Process responses to articles
-    print("\n🔄 Step 2: Processing responses to individual articles...")
-    processed_count = 0
-    for response_id in response_ids:
-        result = process_responses(response_id=response_id)
-        if result:
-            processed_count += 1
-    
-    print(f"✅ Step 2 complete. Processed {processed_count} response batches.")
+
+    # Step 2: Individual articles are extracted in the same transaction that
+    # saves each response batch, so no separate re-parse pass is needed
+    print(f"\n✅ Step 2 complete. Articles extracted alongside {len(response_ids)} response batches.")
     
     # Step 3: Create vector database
     print("\n🔄 Step 3: Creating vector database...")
-    create_vector_db(date_str=args.start_date)
-    
-    print("✅ Step 3 complete. Vector database created.")
+    vector_result = create_vector_db(date_str=args.start_date)
+
+    if vector_result:
+        print("✅ Step 3 complete. Vector database created.")
+    else:
+        print("⚠️ Step 3 completed with warnings. Check vector database logs.")
     
     # Step 4: Create mock users
     print("\n🔄 Step 4: Creating mock users and reading history...")
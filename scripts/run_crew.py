@@ -5,129 +5,242 @@ Database Analysis Execution Script
 This script orchestrates the execution of database analysis using CrewAI agents.
 """
 
-import json
+from __future__ import annotations
+
+import asyncio
 import sys
 import argparse
-from datetime import datetime, timedelta
+from datetime import datetime
 from pathlib import Path
-from typing import Tuple, Any, Dict
+from typing import Tuple, Any, Dict, List
 import os
 
 # Add the project root to the path
-project_root = Path(__file__).parent.parent
-sys.path.append(str(project_root))
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+# Resolved once at import so report writes don't re-walk the path per call
+REPORTS_DIR = PROJECT_ROOT / "reports"
+
+# The crewai/agent imports pull in the whole LLM tool chain (litellm and
+# friends, several seconds cold), so they are deferred into AgentExecutor -
+# argparse --help and argument errors return instantly
+def _import_agent_stack():
+    """Import the heavy crew dependencies on first use."""
+    global Crew, DatabaseAgent, RecommenderAgent, ReportWriterAgent
+    global QueryTaskBuilder, DatabaseTool
+    global PersonalizedReportOutput, ReportCache
+    from crewai import Crew
+    from src.llm.agent.agents import DatabaseAgent, RecommenderAgent, ReportWriterAgent
+    from src.llm.agent.tasks import QueryTaskBuilder
+    global VectorSearchHydrateTool
+    from src.llm.agent.tools import DatabaseTool, VectorSearchHydrateTool
+    from src.llm.agent.models import PersonalizedReportOutput
+    from src.llm.agent.report_cache import ReportCache
+
 
-from crewai import Crew
-from src.llm.agent.agents import DatabaseAgent, RecommenderAgent, ReportWriterAgent
-from src.llm.agent.tasks import QueryTaskBuilder
-from src.llm.agent.tools import DatabaseTool, VectorDatabaseTool
+# Translation table for sanitizing email addresses into filenames
+_AT_TABLE = str.maketrans({'@': '_at_'})
 
 
 class AgentExecutor:
     """Main class for executing database analysis through CrewAI agents."""
     
-    def __init__(self, target_date: str):        
+    def __init__(self, target_date: str, use_cache: bool = True):
+        _import_agent_stack()
+
         # Initialize database and vector tools
         database_url = os.getenv("DATABASE_URL")
         if not database_url:
             raise ValueError("DATABASE_URL environment variable is required")
-            
+
         self.database_tool = DatabaseTool(database_url)
-        self.vector_tool = VectorDatabaseTool(target_date=target_date)
+        # One compound tool covers the whole recommendation step: batched
+        # vector search plus article hydration in a single agent call
+        self.vector_tool = VectorSearchHydrateTool(database_url, target_date=target_date)
+
+        self.target_date = target_date
+        # Finished reports are cached per (user, target date) so repeat runs
+        # skip the crew entirely
+        self.report_cache = ReportCache() if use_cache else None
 
-        # Initialize task builder
+        # Initialize task builder once - it introspects the database schema,
+        # so reusing it across runs saves that query per analysis. Agents
+        # are memoized by the factories in agents.py keyed on their tools.
         self.task_builder = QueryTaskBuilder()
-        
-        # Create agents
-        self.database_agent = DatabaseAgent.create_agent([self.database_tool])
-        self.recommender_agent = RecommenderAgent.create_agent(
-            self.database_tool, 
-            self.vector_tool
-        )
-        self.report_writer_agent = ReportWriterAgent.create_agent()
 
-    def execute_full_analysis(self, user_email: str) -> Dict[str, Any]:
-        """Execute the complete analysis pipeline with three agents."""
+        # Report files written eagerly by the task callback, keyed by user
+        self._saved_report_paths: Dict[str, Path] = {}
+
+        # Computed once per executor: every report of a batch shares one
+        # sortable timestamp prefix and the directory is only mkdir'd here
+        REPORTS_DIR.mkdir(exist_ok=True)
+        self.run_ts = datetime.now().strftime("%Y%m%d_%H%M%S")
+
+    # Bound on concurrently running per-user crews, sized to stay inside
+    # the LLM provider's requests-per-minute limits
+    MAX_PARALLEL_ANALYSES = 3
+
+    def _build_crew(self, user_email: str, shared_agents: bool = True) -> Tuple[Crew, list]:
+        """Build the three-agent crew and its task chain for one user.
+
+        shared_agents=False builds fresh Agent instances for crews that run
+        concurrently - agents hold mutable per-execution state, so parallel
+        kickoffs must not share them. Sequential runs reuse the memoized
+        agents from the factories.
+        """
+        db_agent = DatabaseAgent.create_agent([self.database_tool], shared=shared_agents)
+        recommender_agent = RecommenderAgent.create_agent(self.vector_tool, self.database_tool,
+                                                          shared=shared_agents)
+        report_agent = ReportWriterAgent.create_agent(shared=shared_agents)
 
-        # Create agents
-        db_agent = DatabaseAgent.create_agent([self.database_tool])
-        recommender_agent = RecommenderAgent.create_agent(self.vector_tool, self.database_tool)
-        report_agent = ReportWriterAgent.create_agent()
-        
-        # Create tasks
         analysis_task = self.task_builder.create_analysis_task(user_email, db_agent)
+        intro_task = self.task_builder.create_report_intro_task(user_email, report_agent)
         recommendation_task = self.task_builder.create_recommendation_task_with_context(recommender_agent)
         report_task = self.task_builder.create_report_generation_task(user_email, report_agent)
-        
-        # Set up task dependencies
+
+        # Set up task dependencies - the async intro task only needs the
+        # analysis, so it runs while the recommendation task is in flight
+        intro_task.context = [analysis_task]
         recommendation_task.context = [analysis_task]
-        report_task.context = [analysis_task, recommendation_task]
-        
-        # Execute the crew with all three agents and tasks
-        result = self._run_single_crew(
-            [db_agent, recommender_agent, report_agent], 
-            [analysis_task, recommendation_task, report_task], 
-            user_email
-        )
-        return result
-    
-    def _run_single_crew(self, agents, tasks, user_email) -> Dict[str, Any]:
-        """Run a single crew with all agents and tasks."""
-        
-        print("=== Starting Complete Analysis Pipeline ===")
-        
-        # Create single crew with all agents and tasks
+        report_task.context = [analysis_task, recommendation_task, intro_task]
+
+        tasks = [analysis_task, intro_task, recommendation_task, report_task]
         crew = Crew(
-            agents=agents,
+            agents=[db_agent, recommender_agent, report_agent],
             tasks=tasks,
             verbose=True,
-            memory=True
+            memory=True,
+            # Persist the report the moment its task completes, not after
+            # the whole kickoff unwinds
+            task_callback=lambda task_output: self._persist_report_output(task_output, user_email)
         )
-        result = crew.kickoff()
-        result = tasks[-1].output.pydantic
-        
-        # Save the markdown report to file if it's a PersonalizedReportOutput
-            # Create reports directory if it doesn't exist
-        from pathlib import Path
-        reports_dir = Path(__file__).parent.parent / "reports"
-        reports_dir.mkdir(exist_ok=True)
-        
-        # Generate filename with timestamp
-        from datetime import datetime
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"news_recommendations_{user_email.replace('@', '_at_')}_{timestamp}.md"
-        file_path = reports_dir / filename
-        
+        return crew, tasks
+
+    def _persist_report_output(self, task_output, user_email: str) -> None:
+        """Write the report to disk as soon as the report task produces it.
+
+        The callback fires per finished task; only the final task yields a
+        PersonalizedReportOutput. Writing here means the report survives any
+        failure in the post-kickoff parsing/caching path instead of living
+        only in memory until the very end of the run.
+        """
+        result = getattr(task_output, 'pydantic', None)
+        if not isinstance(result, PersonalizedReportOutput):
+            return
+        self._saved_report_paths[user_email] = self._write_report_file(result, user_email)
+
+    def _cached_report(self, user_email: str):
+        """Look up a cached report for this user and target date."""
+        if self.report_cache is None:
+            return None
+        key = ReportCache.make_key(user_email, self.target_date)
+        cached = self.report_cache.get(key)
+        if cached is not None:
+            print(f"=== Using cached report for {user_email} ===")
+        return cached
+
+    def _store_report(self, user_email: str, result) -> None:
+        """Store a finished report in the cache."""
+        if self.report_cache is not None:
+            self.report_cache.put(ReportCache.make_key(user_email, self.target_date), result)
+
+    def execute_full_analysis(self, user_email: str) -> Dict[str, Any]:
+        """Execute the complete analysis pipeline with three agents."""
+        cached = self._cached_report(user_email)
+        if cached is not None:
+            return cached
+
+        print("=== Starting Complete Analysis Pipeline ===")
+        crew, tasks = self._build_crew(user_email)
+        crew.kickoff()
+        result = self._save_report(tasks, user_email)
+        self._store_report(user_email, result)
+        return result
+
+    async def execute_full_analysis_async(self, user_email: str) -> Dict[str, Any]:
+        """Async variant of execute_full_analysis, usable with asyncio.gather."""
+        cached = self._cached_report(user_email)
+        if cached is not None:
+            return cached
+
+        print(f"=== Starting Complete Analysis Pipeline for {user_email} ===")
+        # Fresh agents per crew: several of these run under asyncio.gather
+        crew, tasks = self._build_crew(user_email, shared_agents=False)
+        await crew.kickoff_async()
+        result = self._save_report(tasks, user_email)
+        self._store_report(user_email, result)
+        return result
+
+    async def execute_many(self, user_emails: List[str],
+                           max_parallel: int = MAX_PARALLEL_ANALYSES) -> List[Dict[str, Any]]:
+        """Run the full analysis for several users concurrently.
+
+        The work is I/O-bound on LLM and database latency, so overlapping
+        users brings an N-user batch close to the wall time of the slowest
+        single run. A semaphore keeps at most max_parallel crews in flight.
+        """
+        semaphore = asyncio.Semaphore(max_parallel)
+
+        async def run_one(email: str):
+            async with semaphore:
+                return await self.execute_full_analysis_async(email)
+
+        return await asyncio.gather(*(run_one(email) for email in user_emails))
+
+    def _write_report_file(self, result, user_email) -> Path:
+        """Write one markdown report to the reports directory."""
+        filename = f"news_recommendations_{user_email.translate(_AT_TABLE)}_{self.run_ts}.md"
+        file_path = REPORTS_DIR / filename
+
         result.save_to_file(str(file_path))
         print(f"Report saved to: {file_path}")
-        
+        return file_path
+
+    def _save_report(self, tasks, user_email) -> Dict[str, Any]:
+        """Return the structured report, writing it to disk if the callback hasn't."""
+        result = tasks[-1].output.pydantic
+
+        if self._saved_report_paths.pop(user_email, None) is None:
+            self._write_report_file(result, user_email)
+
         return result
 
 
 def main():
     """Main execution function."""
     parser = argparse.ArgumentParser(description='Run database analysis and generate personalized recommendations')
-    parser.add_argument('--user-email', 
-                       type=str, 
+    parser.add_argument('--user-email',
+                       type=str,
                        default='petr.pavel@gmail.com',
-                       help='Email address of the user for personalized recommendations (default: petr.pavel@gmail.com)')
+                       help='Email address(es) for personalized recommendations, comma-separated '
+                            'for a concurrent multi-user run (default: petr.pavel@gmail.com)')
     parser.add_argument('--target-date',
                     type=str,
                     default='2025-06-21',
                     help='Target date for vector database in YYYY-MM-DD format (default: 2025-06-20)')
-    
+    parser.add_argument('--no-cache',
+                    action='store_true',
+                    help='Skip the report cache and always run the full crew')
+
     args = parser.parse_args()
-    user_email = args.user_email
+    user_emails = [email.strip() for email in args.user_email.split(',')]
 
     args.target_date = datetime.strptime(args.target_date, "%Y-%m-%d").date()
-    
-    executor = AgentExecutor(target_date=args.target_date)
-    
-    # Execute full pipeline
-    full_result = executor.execute_full_analysis(user_email)
+
+    executor = AgentExecutor(target_date=args.target_date, use_cache=not args.no_cache)
+
+    # Execute full pipeline - multiple users run concurrently via async kickoff
+    if len(user_emails) > 1:
+        results = asyncio.run(executor.execute_many(user_emails))
+    else:
+        results = [executor.execute_full_analysis(user_emails[0])]
+
     print("\n=== Analysis Complete ===")
-    if hasattr(full_result, 'report_title'):
-        print(f"Generated report: {full_result.report_title}")
+    for full_result in results:
+        if hasattr(full_result, 'report_title'):
+            print(f"Generated report: {full_result.report_title}")
     
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Offline Batch Report Generation Script
+
+Generates personalized reports for many users through the OpenAI Batch API
+instead of the interactive crew. Batch jobs run at a 50% token discount with
+a 24h completion window, which fits the nightly many-subscriber workload:
+the run is throughput-bound, not latency-bound.
+
+Each stage (analysis -> recommendation -> report) is one batch job covering
+every user; stage outputs are stitched into the next stage's prompts. Tool
+calls are not available inside a batch, so the reading history and vector
+search results are resolved locally and inlined into the prompts.
+"""
+
+import sys
+import json
+import time
+import argparse
+from pathlib import Path
+from datetime import datetime
+
+# Add the project root to the path
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from openai import OpenAI
+
+from src.db_utils.db_config import get_db_connection
+from src.llm.vector_store import VectorStore
+from src.llm.agent.models import ClusterAnalysisOutput, PersonalizedReportOutput
+
+MODEL = "gpt-4o-mini"
+POLL_INTERVAL_SECONDS = 30
+ARTICLES_PER_CLUSTER = 2
+
+
+def fetch_reading_history(user_email: str) -> list:
+    """Fetch the titles and bodies of articles the user has read."""
+    # Bodies are truncated in SQL so only the kilobyte the prompt uses
+    # crosses the wire, not full article texts
+    query = """
+        SELECT a.title, LEFT(a.body, 1000), a.source_uri, a.date
+        FROM articles a
+        JOIN user_articles ua ON a.id = ua.article_id
+        JOIN users u ON u.id = ua.user_id
+        WHERE u.user_email = %s
+        ORDER BY ua.created_at DESC
+    """
+    with get_db_connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute(query, (user_email,))
+            return [{'title': row[0], 'body': row[1] or '',
+                     'source': row[2], 'date': str(row[3])}
+                    for row in cursor.fetchall()]
+
+
+def analysis_prompt(user_email: str, history: list) -> str:
+    """Build the cluster-analysis prompt with the history inlined."""
+    history_json = json.dumps(history, ensure_ascii=False)
+    return f"""
+    Analyze the reading history for user '{user_email}' and group their
+    interests into 3 distinct clusters based on topics, themes or content
+    types. For each cluster, write a detailed paragraph describing the
+    user's interests in that area.
+
+    READING HISTORY (JSON):
+    {history_json}
+
+    Respond as a JSON object with keys cluster_1, cluster_2 and cluster_3,
+    each containing one cluster description paragraph.
+    """
+
+
+def report_prompt(user_email: str, recommendations: dict) -> str:
+    """Build the report-writing prompt from resolved recommendations."""
+    recommendations_json = json.dumps(recommendations, ensure_ascii=False)
+    return f"""
+    Create a personalized, engaging markdown report for user '{user_email}'
+    based on the article recommendations below. Structure it with an
+    introduction, one section per recommended article (title as a link,
+    source, a 2-3 sentence summary, and why it fits the user's interests),
+    and an encouraging conclusion.
+
+    RECOMMENDATIONS (JSON, organized by interest cluster):
+    {recommendations_json}
+
+    Respond as a JSON object with keys markdown_report, report_title and
+    user_email.
+    """
+
+
+def build_batch_jsonl(stage: str, prompts_by_email: dict, output_dir: Path) -> Path:
+    """Write one chat-completion request per user for a batch stage."""
+    output_dir.mkdir(parents=True, exist_ok=True)
+    jsonl_path = output_dir / f"batch_{stage}.jsonl"
+    with open(jsonl_path, 'w', encoding='utf-8') as f:
+        for user_email, prompt in prompts_by_email.items():
+            request = {
+                "custom_id": f"{user_email}:{stage}",
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": {
+                    "model": MODEL,
+                    "messages": [{"role": "user", "content": prompt}],
+                    "response_format": {"type": "json_object"}
+                }
+            }
+            f.write(json.dumps(request) + "\n")
+    return jsonl_path
+
+
+def run_batch(client: OpenAI, jsonl_path: Path) -> dict:
+    """Submit a batch job and block until its results are available.
+
+    Returns the parsed JSON response content keyed by custom_id.
+    """
+    with open(jsonl_path, 'rb') as f:
+        input_file = client.files.create(file=f, purpose='batch')
+
+    batch = client.batches.create(
+        input_file_id=input_file.id,
+        endpoint="/v1/chat/completions",
+        completion_window="24h"
+    )
+    print(f"Submitted batch {batch.id} ({jsonl_path.name})")
+
+    while batch.status not in ('completed', 'failed', 'expired', 'cancelled'):
+        time.sleep(POLL_INTERVAL_SECONDS)
+        batch = client.batches.retrieve(batch.id)
+        print(f"Batch {batch.id} status: {batch.status}")
+
+    if batch.status != 'completed':
+        raise RuntimeError(f"Batch {batch.id} finished with status: {batch.status}")
+
+    output = client.files.content(batch.output_file_id)
+    results = {}
+    for line in output.text.splitlines():
+        record = json.loads(line)
+        content = record['response']['body']['choices'][0]['message']['content']
+        results[record['custom_id']] = json.loads(content)
+    return results
+
+
+def resolve_recommendations(clusters: ClusterAnalysisOutput, vector_store: VectorStore) -> dict:
+    """Run the vector search for each cluster locally and hydrate article rows."""
+    recommendations = {}
+    for label in ('cluster_1', 'cluster_2', 'cluster_3'):
+        description = getattr(clusters, label)
+        articles = vector_store.search_similar(description, k=ARTICLES_PER_CLUSTER)
+        recommendations[label] = {
+            'cluster_description': description,
+            'articles': [{'article_id': a['id'], 'title': a.get('title'),
+                          'url': a.get('url'), 'source': a.get('source_uri'),
+                          'body': (a.get('body') or '')[:1000]}
+                         for a in articles]
+        }
+    return recommendations
+
+
+def main():
+    """Main batch execution function."""
+    parser = argparse.ArgumentParser(description='Generate personalized reports offline via the OpenAI Batch API')
+    parser.add_argument('--user-emails',
+                       type=str,
+                       required=True,
+                       help='Comma-separated email addresses to generate reports for')
+    args = parser.parse_args()
+    user_emails = [email.strip() for email in args.user_emails.split(',')]
+
+    client = OpenAI()
+    vector_store = VectorStore(use_existing_version=True)
+    batch_dir = PROJECT_ROOT / "data" / "batch_jobs" / datetime.now().strftime("%Y%m%d_%H%M%S")
+
+    # Stage 1: cluster analysis for all users in one batch
+    analysis_prompts = {email: analysis_prompt(email, fetch_reading_history(email))
+                        for email in user_emails}
+    analysis_results = run_batch(client, build_batch_jsonl("analysis", analysis_prompts, batch_dir))
+
+    # Stage 2: resolve vector search locally - it is cheap compared to the
+    # LLM stages and keeps the batch prompts self-contained
+    recommendations_by_email = {}
+    for email in user_emails:
+        clusters = ClusterAnalysisOutput(**analysis_results[f"{email}:analysis"])
+        recommendations_by_email[email] = resolve_recommendations(clusters, vector_store)
+
+    # Stage 3: report writing for all users in one batch
+    report_prompts = {email: report_prompt(email, recommendations_by_email[email])
+                      for email in user_emails}
+    report_results = run_batch(client, build_batch_jsonl("report", report_prompts, batch_dir))
+
+    # Persist the reports the same way the interactive crew does
+    reports_dir = PROJECT_ROOT / "reports"
+    reports_dir.mkdir(exist_ok=True)
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    for email in user_emails:
+        report = PersonalizedReportOutput(**report_results[f"{email}:report"])
+        filename = f"news_recommendations_{email.replace('@', '_at_')}_{timestamp}.md"
+        file_path = reports_dir / filename
+        report.save_to_file(str(file_path))
+        print(f"Report saved to: {file_path}")
+
+    print(f"\n✓ Generated {len(user_emails)} reports in batch mode")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,25 +1,40 @@
 """Database configuration and connection utilities for PostgreSQL."""
 
+import atexit
 import os
-import psycopg2
+from itertools import count
 from typing import Dict
 from contextlib import contextmanager
 
+from psycopg2.pool import ThreadedConnectionPool
+
 
 class DatabaseConfig:
     """Database configuration management."""
-    
+
     def __init__(self):
         self.host = os.getenv('DB_HOST', 'localhost')
         self.port = os.getenv('DB_PORT', '5432')
         self.database = os.getenv('DB_NAME', 'postgres')
         self.user = os.getenv('DB_USER', 'user')
         self.password = os.getenv('DB_PASSWORD', 'password')
-    
+
     def get_connection_params(self) -> Dict[str, str]:
-        """Get database connection parameters as dictionary."""
+        """Get database connection parameters as dictionary.
+
+        Prefers the UNIX socket for a local server: psycopg2 treats a
+        leading-slash host as a socket directory, which skips the TCP
+        loopback stack - measurable on the many small SELECTs the agent
+        tools issue. The port still selects the .s.PGSQL.<port> socket.
+        The substitution happens only here so self.host keeps the plain
+        TCP name for consumers that splice it into a URL.
+        """
+        host = self.host
+        socket_dir = os.getenv('DB_SOCKET_DIR', '/var/run/postgresql')
+        if host in ('localhost', '127.0.0.1') and os.path.isdir(socket_dir):
+            host = socket_dir
         return {
-            'host': self.host,
+            'host': host,
             'port': self.port,
             'database': self.database,
             'user': self.user,
@@ -27,18 +42,60 @@ class DatabaseConfig:
         }
 
 
+# Shared connection pool so the pipeline scripts reuse warm connections
+# instead of paying TCP/TLS/auth setup on every get_db_connection() call
+_pool = None
+
+
+def _get_pool() -> ThreadedConnectionPool:
+    """Lazily create the process-wide connection pool.
+
+    Pool bounds are tunable through DB_POOL_MIN/DB_POOL_MAX so concurrent
+    workloads (thread-pool ETL steps, parallel crew runs) can size the pool
+    to their fan-out without code changes.
+    """
+    global _pool
+    if _pool is None:
+        config = DatabaseConfig()
+        min_size = int(os.getenv('DB_POOL_MIN', '2'))
+        max_size = int(os.getenv('DB_POOL_MAX', '16'))
+        _pool = ThreadedConnectionPool(min_size, max_size, **config.get_connection_params())
+        atexit.register(_pool.closeall)
+    return _pool
+
+
 @contextmanager
 def get_db_connection():
-    """Context manager for database connections."""
-    config = DatabaseConfig()
-    conn = None
+    """Context manager for pooled database connections."""
+    pool = _get_pool()
+    conn = pool.getconn()
     try:
-        conn = psycopg2.connect(**config.get_connection_params())
         yield conn
     except Exception as e:
-        if conn:
-            conn.rollback()
+        conn.rollback()
         raise e
     finally:
-        if conn:
-            conn.close()
\ No newline at end of file
+        pool.putconn(conn)
+
+
+# Named cursors must be unique per connection while open; a process-wide
+# sequence sidesteps collisions when pooled connections are reused
+_cursor_seq = count()
+
+
+def iter_rows(conn, sql: str, params=None, itersize: int = 2000):
+    """Stream a read query's rows through a server-side cursor.
+
+    Postgres keeps the result set and ships rows over in chunks of
+    `itersize`, so client memory stays O(itersize) regardless of how many
+    rows the query returns - use this instead of fetchall() for any read
+    that can grow large.
+    """
+    with conn.cursor(name=f'iter_rows_{next(_cursor_seq)}') as cursor:
+        cursor.itersize = itersize
+        cursor.execute(sql, params)
+        while True:
+            rows = cursor.fetchmany(itersize)
+            if not rows:
+                break
+            yield from rows
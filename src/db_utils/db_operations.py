@@ -1,32 +1,261 @@
 """Database operations for news data management."""
 
-import json
-from typing import Dict, Any, Optional
+import csv
+import io
+import os
+from functools import lru_cache
+from typing import Dict, Any, List, Optional, Tuple
+
+import orjson
+import psycopg2.errors
+from psycopg2.extras import Json, RealDictCursor, execute_values
+
 from .db_config import get_db_connection, DatabaseConfig
 
 
+def _dumps(obj: Any) -> str:
+    """Serialize to JSON with orjson (several times faster than stdlib json)."""
+    return orjson.dumps(obj).decode()
+
+
+class _IterableIO(io.RawIOBase):
+    """Read-only file object over an iterator of byte chunks.
+
+    copy_expert pulls from this on demand, so rows flow from the source
+    iterator straight to the socket with O(1) buffering - the socket
+    backpressures the generator instead of the whole payload being
+    materialized up front.
+    """
+
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+        self._buf = b''
+
+    def readable(self) -> bool:
+        return True
+
+    def read(self, size: int = -1) -> bytes:
+        if size is None or size < 0:
+            out = self._buf + b''.join(self._chunks)
+            self._buf = b''
+            return out
+        while len(self._buf) < size:
+            try:
+                self._buf += next(self._chunks)
+            except StopIteration:
+                break
+        out, self._buf = self._buf[:size], self._buf[size:]
+        return out
+
+
+def _json(obj: Any) -> Json:
+    """Wrap a dict for the JSONB columns.
+
+    The Json adapter hands psycopg2 a value it can quote once for the
+    wire instead of treating the payload as a plain string parameter;
+    orjson does the serialization underneath.
+    """
+    return Json(obj, dumps=_dumps)
+
+
+# Bumped whenever the schema may have changed; part of the cache key so
+# stale descriptions are dropped without clearing the lru_cache by hand
+_schema_version = 0
+
+
+def invalidate_schema_cache() -> None:
+    """Force the next get_database_schema call to rebuild from the catalogs."""
+    global _schema_version
+    _schema_version += 1
+
+
+@lru_cache(maxsize=2)
+def _cached_schema(version: int, tables: Tuple[str, ...]) -> str:
+    return DatabaseOperations()._compute_schema_description(tables)
+
+
+# Prepared statements keep their plan for the life of a session, but break
+# behind transaction-mode poolers (pgbouncer) where sessions are shared -
+# hence the off switch
+_USE_PREPARED = os.getenv('DB_PREPARED_STATEMENTS', '1') != '0'
+
+_SAVE_NEWS_PREPARE = """
+PREPARE save_news (jsonb, jsonb) AS
+INSERT INTO news_api_responses (raw_request, raw_response)
+VALUES ($1, $2)
+RETURNING id;
+"""
+
+
 class DatabaseOperations:
     """Database operations manager."""
-    
+
+    # Below this row count a multi-row INSERT wins; above it COPY's bulk
+    # load path amortizes its setup cost and pulls far ahead
+    COPY_MIN_ROWS = 50
+
     def __init__(self):
         self.config = DatabaseConfig()
-    
+
+    @staticmethod
+    def _ensure_save_news_prepared(conn, cursor) -> None:
+        """PREPARE the save_news statement once per pooled connection.
+
+        Prepared state lives as an attribute on the connection object
+        itself: the pool closes connections returned beyond minconn, so a
+        module-level id() set would go stale when ids get recycled.
+        """
+        if getattr(conn, '_save_news_prepared', False):
+            return
+        try:
+            cursor.execute(_SAVE_NEWS_PREPARE)
+        except psycopg2.errors.DuplicatePreparedStatement:
+            conn.rollback()
+        conn._save_news_prepared = True
+
     def save_news_data(self, raw_request: Dict[str, Any], raw_response: Dict[str, Any]) -> Optional[int]:
-        """Save raw request and response to database."""
+        """Save raw request and response to database.
+
+        The INSERT is identical every call, so it runs through a server-side
+        prepared statement: parse and plan happen once per connection, and
+        each save is a plain EXECUTE afterwards.
+        """
         insert_sql = """
         INSERT INTO news_api_responses (raw_request, raw_response)
         VALUES (%s, %s)
         RETURNING id;
         """
-        
+
+        params = (_json(raw_request), _json(raw_response))
         with get_db_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute(insert_sql, (json.dumps(raw_request), json.dumps(raw_response)))
-            record_id = cursor.fetchone()[0]
+            with conn.cursor() as cursor:
+                if _USE_PREPARED:
+                    self._ensure_save_news_prepared(conn, cursor)
+                    try:
+                        cursor.execute("EXECUTE save_news (%s, %s)", params)
+                    except psycopg2.errors.InvalidSqlStatementName:
+                        # Session lost the statement (e.g. a pooler swapped
+                        # sessions underneath): re-prepare next time and run
+                        # the plain insert now
+                        conn.rollback()
+                        conn._save_news_prepared = False
+                        cursor.execute(insert_sql, params)
+                else:
+                    cursor.execute(insert_sql, params)
+                record_id = cursor.fetchone()[0]
             conn.commit()
-            cursor.close()
             return record_id
     
+    @staticmethod
+    def _article_rows(response_id: int, raw_response: Dict[str, Any]) -> List[tuple]:
+        """Build articles-table rows from a raw NewsAPI response."""
+        return [(
+            response_id,
+            article.get('url'),
+            article.get('lang'),
+            article.get('date'),
+            article.get('dataType'),
+            article.get('title'),
+            article.get('body'),
+            article.get('sentiment'),
+            article.get('source', {}).get('uri')
+        ) for article in raw_response.get('articles', {}).get('results', [])]
+
+    @staticmethod
+    def _csv_chunks(rows: List[tuple]):
+        """Yield one encoded CSV line per article row."""
+        buf = io.StringIO()
+        writer = csv.writer(buf, quoting=csv.QUOTE_MINIMAL)
+        for row in rows:
+            writer.writerow(['' if value is None else value for value in row])
+            yield buf.getvalue().encode()
+            buf.seek(0)
+            buf.truncate()
+
+    # Column list shared by the INSERT and COPY article paths
+    ARTICLE_COLUMNS_SQL = "request_id, url, lang, date, datatype, title, body, sentiment, source_uri"
+
+    # Skips rows whose url already exists (matching idx_articles_url), so
+    # re-processing a response costs no WAL for its duplicates
+    ON_CONFLICT_SQL = "ON CONFLICT (url) WHERE url IS NOT NULL DO NOTHING"
+
+    @classmethod
+    def _copy_articles(cls, cursor, rows: List[tuple]) -> None:
+        """Bulk-load article rows through COPY, streaming row by row.
+
+        COPY ships the whole batch as one server-side bulk operation with
+        no per-row parse/plan, which beats even multi-row INSERT by an order
+        of magnitude on large payloads. Rows are encoded lazily through
+        _IterableIO, so peak memory stays one CSV line regardless of batch
+        size. COPY itself can't skip conflicts, so rows land in a temp
+        staging table first and move over with ON CONFLICT DO NOTHING.
+        """
+        cursor.execute(
+            "CREATE TEMP TABLE articles_stage (LIKE articles INCLUDING DEFAULTS) ON COMMIT DROP;"
+        )
+        cursor.copy_expert(
+            f"COPY articles_stage ({cls.ARTICLE_COLUMNS_SQL}) "
+            "FROM STDIN WITH (FORMAT CSV, NULL '')",
+            _IterableIO(cls._csv_chunks(rows))
+        )
+        cursor.execute(
+            f"INSERT INTO articles ({cls.ARTICLE_COLUMNS_SQL}) "
+            f"SELECT {cls.ARTICLE_COLUMNS_SQL} FROM articles_stage "
+            f"{cls.ON_CONFLICT_SQL};"
+        )
+        # Drop now rather than at commit so several batches can share one
+        # transaction
+        cursor.execute("DROP TABLE articles_stage;")
+
+    def _insert_article_rows(self, cursor, rows: List[tuple]) -> None:
+        """Insert article rows, choosing COPY or execute_values by batch size."""
+        if not rows:
+            return
+        if len(rows) >= self.COPY_MIN_ROWS:
+            self._copy_articles(cursor, rows)
+        else:
+            insert_sql = f"""
+            INSERT INTO articles ({self.ARTICLE_COLUMNS_SQL})
+            VALUES %s
+            {self.ON_CONFLICT_SQL};
+            """
+            execute_values(cursor, insert_sql, rows, page_size=1000)
+
+    def save_news_data_batch(self, records: List[Tuple[Dict[str, Any], Dict[str, Any]]]) -> List[int]:
+        """Save multiple (request, response) pairs in a single transaction.
+
+        One multi-row insert means one transaction and one fsync for the
+        whole batch instead of one per record. The individual articles are
+        extracted from each response and inserted in the same transaction,
+        while the parsed payload is still in memory - no separate
+        re-load/re-parse pass over the stored JSON is needed. Returns the
+        new response record IDs in input order.
+        """
+        if not records:
+            return []
+
+        insert_sql = """
+        INSERT INTO news_api_responses (raw_request, raw_response)
+        VALUES %s
+        RETURNING id;
+        """
+
+        rows = [(_json(raw_request), _json(raw_response))
+                for raw_request, raw_response in records]
+
+        with get_db_connection() as conn:
+            with conn.cursor() as cursor:
+                returned = execute_values(cursor, insert_sql, rows, fetch=True)
+                response_ids = [row[0] for row in returned]
+
+                article_rows = []
+                for response_id, (_, raw_response) in zip(response_ids, records):
+                    article_rows.extend(self._article_rows(response_id, raw_response))
+                self._insert_article_rows(cursor, article_rows)
+
+            conn.commit()
+            return response_ids
+
     def get_response_by_id(self, response_id: int) -> Optional[Dict[str, Any]]:
         """Get a response record by ID."""
         select_sql = """
@@ -36,19 +265,13 @@ class DatabaseOperations:
         """
         
         with get_db_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute(select_sql, (response_id,))
-            row = cursor.fetchone()
-            cursor.close()
-            
-            if row:
-                return {
-                    'id': row[0],
-                    'raw_request': row[1],
-                    'raw_response': row[2],
-                    'created_at': row[3]
-                }
-            return None
+            # RealDictCursor builds the dict while decoding the row, so no
+            # manual tuple-to-dict mapping per call
+            with conn.cursor(cursor_factory=RealDictCursor) as cursor:
+                cursor.execute(select_sql, (response_id,))
+                row = cursor.fetchone()
+
+            return dict(row) if row else None
     
     def process_response_to_articles(self, response_id: int) -> bool:
         """Process a raw response and extract articles to the articles table."""
@@ -65,108 +288,128 @@ class DatabaseOperations:
             print(f"No articles found in response ID: {response_id}")
             return False
         
-        insert_sql = """
-        INSERT INTO articles (request_id, url, lang, date, datatype, title, body, sentiment, source_uri)
-        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s);
-        """
-        
+        rows = self._article_rows(response_id, raw_response)
+
         with get_db_connection() as conn:
-            cursor = conn.cursor()
-            
-            articles_inserted = 0
-            for article in articles_data:
-                cursor.execute(insert_sql, (
-                    response_id,
-                    article.get('url'),
-                    article.get('lang'),
-                    article.get('date'),
-                    article.get('dataType'),
-                    article.get('title'),
-                    article.get('body'),
-                    article.get('sentiment'),
-                    article.get('source', {}).get('uri')
-                ))
-                articles_inserted += 1
-            
+            with conn.cursor() as cursor:
+                self._insert_article_rows(cursor, rows)
             conn.commit()
-            cursor.close()
-            print(f"Successfully processed {articles_inserted} articles from response ID: {response_id}")
+            print(f"Successfully processed {len(rows)} articles from response ID: {response_id}")
             return True
         
+    # Tables exposed to the LLM in the schema description
+    SCHEMA_TABLES = ('users', 'articles', 'user_articles', 'news_api_responses')
+    # Tables the agent prompts actually need: the raw API-response archive
+    # only adds tokens to every task description without being queryable in
+    # any useful way by the agents
+    PROMPT_SCHEMA_TABLES = ('users', 'articles', 'user_articles')
+
     def get_database_schema(self) -> str:
-        """Get complete database schema information."""
-        schema_sql = """
-        SELECT 
-            t.table_name,
-            c.column_name,
-            c.data_type,
-            c.character_maximum_length,
-            c.is_nullable,
-            c.column_default,
-            tc.constraint_type,
-            kcu.constraint_name,
-            ccu.table_name AS foreign_table_name,
-            ccu.column_name AS foreign_column_name
-        FROM information_schema.tables t
-        LEFT JOIN information_schema.columns c ON t.table_name = c.table_name
-        LEFT JOIN information_schema.key_column_usage kcu ON c.table_name = kcu.table_name 
-            AND c.column_name = kcu.column_name
-        LEFT JOIN information_schema.table_constraints tc ON kcu.constraint_name = tc.constraint_name
-        LEFT JOIN information_schema.constraint_column_usage ccu ON tc.constraint_name = ccu.constraint_name
-        WHERE t.table_schema = 'public' 
-            AND t.table_type = 'BASE TABLE'
-            AND t.table_name IN ('users', 'articles', 'user_articles', 'news_api_responses')
-        ORDER BY t.table_name, c.ordinal_position;
+        """Get complete database schema information.
+
+        The description only changes when DDL runs, so it is computed once
+        per process and served from an in-process cache afterwards;
+        initialize_database invalidates it via invalidate_schema_cache.
         """
-        
+        return _cached_schema(_schema_version, self.SCHEMA_TABLES)
+
+    def get_prompt_schema(self) -> str:
+        """Get the trimmed schema description embedded in agent prompts.
+
+        Same format as get_database_schema but restricted to the tables the
+        agents query, so every task description carries fewer tokens.
+        """
+        return _cached_schema(_schema_version, self.PROMPT_SCHEMA_TABLES)
+
+    def _compute_schema_description(self, tables: Tuple[str, ...]) -> str:
+        """Build the schema description from the system catalogs.
+
+        Reads pg_catalog directly instead of joining five
+        information_schema views - those views are themselves multi-way
+        joins over the catalogs, so two plain catalog queries are far
+        cheaper to plan and execute.
+        """
+        columns_sql = """
+        SELECT c.relname,
+               a.attname,
+               format_type(a.atttypid, a.atttypmod),
+               a.attnotnull
+        FROM pg_class c
+        JOIN pg_namespace n ON n.oid = c.relnamespace
+        JOIN pg_attribute a ON a.attrelid = c.oid
+        WHERE n.nspname = 'public'
+            AND c.relkind = 'r'
+            AND c.relname = ANY(%s)
+            AND a.attnum > 0
+            AND NOT a.attisdropped
+        ORDER BY c.relname, a.attnum;
+        """
+
+        constraints_sql = """
+        SELECT c.relname,
+               con.contype,
+               a.attname,
+               fc.relname,
+               fa.attname
+        FROM pg_constraint con
+        JOIN pg_class c ON c.oid = con.conrelid
+        JOIN pg_namespace n ON n.oid = c.relnamespace
+        JOIN LATERAL unnest(con.conkey) WITH ORDINALITY AS ck(attnum, ord) ON TRUE
+        JOIN pg_attribute a ON a.attrelid = c.oid AND a.attnum = ck.attnum
+        LEFT JOIN pg_class fc ON fc.oid = con.confrelid
+        LEFT JOIN LATERAL unnest(con.confkey) WITH ORDINALITY AS fk(attnum, ord)
+            ON fk.ord = ck.ord
+        LEFT JOIN pg_attribute fa ON fa.attrelid = con.confrelid AND fa.attnum = fk.attnum
+        WHERE n.nspname = 'public'
+            AND c.relname = ANY(%s)
+            AND con.contype IN ('p', 'f', 'u');
+        """
+
         with get_db_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute(schema_sql)
-            rows = cursor.fetchall()
-            cursor.close()
-            
-            # Format schema information
-            schema_info = {}
-            for row in rows:
-                table_name = row[0]
-                if table_name not in schema_info:
-                    schema_info[table_name] = []
-                
-                column_info = {
-                    'column_name': row[1],
-                    'data_type': row[2],
-                    'max_length': row[3],
-                    'nullable': row[4],
-                    'default': row[5],
-                    'constraint_type': row[6],
-                    'foreign_table': row[8],
-                    'foreign_column': row[9]
-                }
-                schema_info[table_name].append(column_info)
-            
-            # Build readable schema description
-            schema_description = "DATABASE SCHEMA INFORMATION:\n\n"
-            for table_name, columns in schema_info.items():
+            with conn.cursor() as cursor:
+                cursor.execute(columns_sql, (list(tables),))
+                column_rows = cursor.fetchall()
+                cursor.execute(constraints_sql, (list(tables),))
+                constraint_rows = cursor.fetchall()
+
+        # Constraint markers keyed by (table, column); PRIMARY KEY wins
+        # over FOREIGN KEY wins over UNIQUE, matching the old output
+        constraint_by_column = {}
+        precedence = {'p': 0, 'f': 1, 'u': 2}
+        for table_name, contype, column_name, foreign_table, foreign_column in constraint_rows:
+            key = (table_name, column_name)
+            current = constraint_by_column.get(key)
+            if current is not None and precedence[current[0]] <= precedence[contype]:
+                continue
+            constraint_by_column[key] = (contype, foreign_table, foreign_column)
+
+        # Build readable schema description
+        schema_description = "DATABASE SCHEMA INFORMATION:\n\n"
+        current_table = None
+        for table_name, column_name, data_type, not_null in column_rows:
+            if table_name != current_table:
+                if current_table is not None:
+                    schema_description += "\n"
                 schema_description += f"{table_name} table:\n"
-                for col in columns:
-                    data_type = col['data_type']
-                    if col['max_length']:
-                        data_type += f"({col['max_length']})"
-                    
-                    constraints = []
-                    if col['constraint_type'] == 'PRIMARY KEY':
-                        constraints.append('PRIMARY KEY')
-                    elif col['constraint_type'] == 'FOREIGN KEY':
-                        constraints.append(f"REFERENCES {col['foreign_table']}({col['foreign_column']})")
-                    elif col['constraint_type'] == 'UNIQUE':
-                        constraints.append('UNIQUE')
-                    
-                    if col['nullable'] == 'NO':
-                        constraints.append('NOT NULL')
-                    
-                    constraint_str = f" ({', '.join(constraints)})" if constraints else ""
-                    schema_description += f"   - {col['column_name']} {data_type}{constraint_str}\n"
-                
-                schema_description += "\n"
-            
-            return schema_description
\ No newline at end of file
+                current_table = table_name
+
+            constraints = []
+            marker = constraint_by_column.get((table_name, column_name))
+            if marker is not None:
+                contype, foreign_table, foreign_column = marker
+                if contype == 'p':
+                    constraints.append('PRIMARY KEY')
+                elif contype == 'f':
+                    constraints.append(f"REFERENCES {foreign_table}({foreign_column})")
+                elif contype == 'u':
+                    constraints.append('UNIQUE')
+            if not_null:
+                constraints.append('NOT NULL')
+
+            constraint_str = f" ({', '.join(constraints)})" if constraints else ""
+            schema_description += f"   - {column_name} {data_type}{constraint_str}\n"
+
+        if current_table is not None:
+            schema_description += "\n"
+
+        return schema_description
\ No newline at end of file
@@ -1,107 +1,132 @@
 """Database schema management and table creation utilities."""
 
 from .db_config import get_db_connection
+from .db_operations import invalidate_schema_cache
+
+
+NEWS_TABLE_SQL = """
+CREATE TABLE IF NOT EXISTS news_api_responses (
+    id SERIAL PRIMARY KEY,
+    raw_request JSONB NOT NULL,
+    raw_response JSONB NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+"""
+
+# Small fixed-size columns come first so the frequently scanned part of the
+# tuple stays compact; the TEXT columns at the end TOAST out of line when
+# large, keeping more rows per heap page for metadata-only queries
+ARTICLES_TABLE_SQL = """
+CREATE TABLE IF NOT EXISTS articles (
+    id SERIAL PRIMARY KEY,
+    request_id INTEGER REFERENCES news_api_responses(id) ON DELETE CASCADE,
+    date DATE,
+    sentiment DECIMAL(10, 8),
+    lang VARCHAR(10),
+    datatype VARCHAR(50),
+    source_uri VARCHAR(255),
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    url TEXT,
+    title TEXT,
+    body TEXT
+);
+
+CREATE INDEX IF NOT EXISTS idx_articles_request_id ON articles(request_id);
+CREATE INDEX IF NOT EXISTS idx_articles_date ON articles(date);
+CREATE INDEX IF NOT EXISTS idx_articles_lang ON articles(lang);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_articles_url ON articles(url) WHERE url IS NOT NULL;
+"""
+
+USERS_TABLE_SQL = """
+CREATE TABLE IF NOT EXISTS users (
+    id SERIAL PRIMARY KEY,
+    user_email VARCHAR(255) UNIQUE NOT NULL,
+    user_preferences TEXT,
+    age INTEGER,
+    gender VARCHAR(6) CHECK (gender IN ('male', 'female')),
+    location VARCHAR(255),
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_users_email ON users(user_email);
+"""
+
+USER_ARTICLES_TABLE_SQL = """
+CREATE TABLE IF NOT EXISTS user_articles (
+    id SERIAL PRIMARY KEY,
+    user_id INTEGER REFERENCES users(id) ON DELETE CASCADE,
+    article_id INTEGER REFERENCES articles(id) ON DELETE CASCADE,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    CONSTRAINT unique_user_article UNIQUE (user_id, article_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_user_articles_user_id ON user_articles(user_id);
+CREATE INDEX IF NOT EXISTS idx_user_articles_article_id ON user_articles(article_id);
+"""
+
+USER_PREFERENCES_TABLE_SQL = """
+CREATE TABLE IF NOT EXISTS user_preferences (
+    id SERIAL PRIMARY KEY,
+    user_id INTEGER REFERENCES users(id) ON DELETE CASCADE,
+    topic TEXT NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    CONSTRAINT unique_user_topic UNIQUE (user_id, topic)
+);
+
+CREATE INDEX IF NOT EXISTS idx_user_preferences_user_id ON user_preferences(user_id);
+"""
+
+# Table order matters: foreign keys reference tables created earlier
+ALL_TABLES_SQL = (NEWS_TABLE_SQL + ARTICLES_TABLE_SQL + USERS_TABLE_SQL
+                  + USER_ARTICLES_TABLE_SQL + USER_PREFERENCES_TABLE_SQL)
 
 
 class DatabaseSchema:
     """Database schema operations manager."""
-    
-    def create_news_table(self) -> bool:
-        """Create the news_api_responses table if it doesn't exist."""
-        create_table_sql = """
-        CREATE TABLE IF NOT EXISTS news_api_responses (
-            id SERIAL PRIMARY KEY,
-            raw_request JSONB NOT NULL,
-            raw_response JSONB NOT NULL,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        );
-        """
-        
+
+    @staticmethod
+    def _execute_ddl(ddl_sql: str) -> bool:
+        """Run a DDL string on one connection in one transaction."""
         with get_db_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute(create_table_sql)
+            cursor.execute(ddl_sql)
             conn.commit()
             cursor.close()
         return True
-    
+
+    def create_news_table(self) -> bool:
+        """Create the news_api_responses table if it doesn't exist."""
+        return self._execute_ddl(NEWS_TABLE_SQL)
+
     def create_articles_table(self) -> bool:
         """Create the articles table if it doesn't exist."""
-        create_table_sql = """
-        CREATE TABLE IF NOT EXISTS articles (
-            id SERIAL PRIMARY KEY,
-            request_id INTEGER REFERENCES news_api_responses(id) ON DELETE CASCADE,
-            url TEXT,
-            lang VARCHAR(10),
-            date DATE,
-            datatype VARCHAR(50),
-            title TEXT,
-            body TEXT,
-            sentiment DECIMAL(10, 8),
-            source_uri VARCHAR(255),
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        );
-        
-        CREATE INDEX IF NOT EXISTS idx_articles_request_id ON articles(request_id);
-        CREATE INDEX IF NOT EXISTS idx_articles_date ON articles(date);
-        CREATE INDEX IF NOT EXISTS idx_articles_lang ON articles(lang);
-        """
-        
-        with get_db_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute(create_table_sql)
-            conn.commit()
-            cursor.close()
-        return True
-    
+        return self._execute_ddl(ARTICLES_TABLE_SQL)
+
     def create_users_table(self) -> bool:
         """Create the users table if it doesn't exist."""
-        create_table_sql = """
-        CREATE TABLE IF NOT EXISTS users (
-            id SERIAL PRIMARY KEY,
-            user_email VARCHAR(255) UNIQUE NOT NULL,
-            user_preferences TEXT,
-            age INTEGER,
-            gender VARCHAR(6) CHECK (gender IN ('male', 'female')),
-            location VARCHAR(255),
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        );
-        
-        CREATE INDEX IF NOT EXISTS idx_users_email ON users(user_email);
-        """
-        
-        with get_db_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute(create_table_sql)
-            conn.commit()
-            cursor.close()
-        return True
-    
+        return self._execute_ddl(USERS_TABLE_SQL)
+
     def create_user_article_relation_table(self) -> bool:
         """Create the many-to-many relationship table between users and articles."""
-        create_table_sql = """
-        CREATE TABLE IF NOT EXISTS user_articles (
-            id SERIAL PRIMARY KEY,
-            user_id INTEGER REFERENCES users(id) ON DELETE CASCADE,
-            article_id INTEGER REFERENCES articles(id) ON DELETE CASCADE,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            CONSTRAINT unique_user_article UNIQUE (user_id, article_id)
-        );
-        
-        CREATE INDEX IF NOT EXISTS idx_user_articles_user_id ON user_articles(user_id);
-        CREATE INDEX IF NOT EXISTS idx_user_articles_article_id ON user_articles(article_id);
+        return self._execute_ddl(USER_ARTICLES_TABLE_SQL)
+
+    def create_user_preferences_table(self) -> bool:
+        """Create the normalized user preference topics table.
+
+        Keeping one short topic per row (instead of the free-text blob on
+        users) lets recommendation queries scan preferences without dragging
+        the large text column through the buffer cache.
         """
-        
-        with get_db_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute(create_table_sql)
-            conn.commit()
-            cursor.close()
-        return True
-    
+        return self._execute_ddl(USER_PREFERENCES_TABLE_SQL)
+
     def initialize_database(self) -> bool:
-        """Initialize all database tables."""
-        self.create_news_table()
-        self.create_articles_table()
-        self.create_users_table()
-        self.create_user_article_relation_table()
+        """Initialize all database tables.
+
+        All DDL runs as one multi-statement execute on a single connection,
+        so cold start costs one round-trip and one commit instead of five.
+        """
+        self._execute_ddl(ALL_TABLES_SQL)
+        # The cached schema description may predate these tables
+        invalidate_schema_cache()
         print("Database initialized successfully")
+        return True
@@ -1,72 +1,191 @@
+import hashlib
+import os
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import threading
 import time
 import logging
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
 from typing import Dict, List, Optional, Any, Union
 from dataclasses import dataclass
-from datetime import datetime, timedelta
-import json
+
+import orjson
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-@dataclass
+class RateLimitedError(Exception):
+    """Raised instead of blocking when the rate limit window is exhausted.
+
+    Carries the seconds to wait so the caller can schedule the retry
+    itself (e.g. sleep in its own executor, or defer the keyword to a
+    later batch) rather than pinning a worker thread.
+    """
+
+    def __init__(self, wait_seconds: int):
+        super().__init__(f"Rate limit reached; retry in {wait_seconds} seconds")
+        self.wait_seconds = wait_seconds
+
+
+@dataclass(slots=True)
 class RateLimiter:
-    """Simple rate limiter to avoid API limits"""
+    """Sliding-window-counter rate limiter to avoid API limits.
+
+    Instead of one timestamp per request, only two integer counters are
+    kept: the current window bucket and the previous one. The effective
+    request count is the current bucket plus the previous bucket weighted
+    by how much of it still overlaps the sliding window - O(1) memory and
+    a handful of float ops per check, at the cost of slight smoothing at
+    the window boundary.
+    """
     max_requests: int = 100
     time_window: int = 3600  # 1 hour in seconds
-    requests_made: List[datetime] = None
-    
+    prev_count: int = 0
+    curr_count: int = 0
+    window_start: float = 0.0
+
     def __post_init__(self):
-        if self.requests_made is None:
-            self.requests_made = []
-    
+        self.window_start = time.monotonic()
+
+    def _roll_window(self, now: float):
+        """Advance the window buckets to cover the current time"""
+        elapsed = now - self.window_start
+        if elapsed >= 2 * self.time_window:
+            # More than a full idle window has passed; both buckets expire
+            self.prev_count = 0
+            self.curr_count = 0
+            self.window_start = now
+        elif elapsed >= self.time_window:
+            self.prev_count = self.curr_count
+            self.curr_count = 0
+            self.window_start += self.time_window
+
+    def _weighted_count(self, now: float) -> float:
+        """Estimate requests inside the sliding window ending at `now`"""
+        overlap = 1.0 - (now - self.window_start) / self.time_window
+        return self.prev_count * overlap + self.curr_count
+
     def can_make_request(self) -> bool:
         """Check if we can make a request within rate limits"""
-        now = datetime.now()
-        # Remove requests older than time window
-        self.requests_made = [req_time for req_time in self.requests_made 
-                             if now - req_time < timedelta(seconds=self.time_window)]
-        
-        return len(self.requests_made) < self.max_requests
-    
+        now = time.monotonic()
+        self._roll_window(now)
+        return self._weighted_count(now) < self.max_requests
+
     def record_request(self):
         """Record that a request was made"""
-        self.requests_made.append(datetime.now())
-    
+        self._roll_window(time.monotonic())
+        self.curr_count += 1
+
     def wait_time(self) -> int:
         """Calculate how long to wait before next request"""
-        if not self.requests_made:
+        now = time.monotonic()
+        self._roll_window(now)
+        if self._weighted_count(now) < self.max_requests:
             return 0
-        
-        oldest_request = min(self.requests_made)
-        wait_until = oldest_request + timedelta(seconds=self.time_window)
-        wait_seconds = (wait_until - datetime.now()).total_seconds()
-        
-        return max(0, int(wait_seconds))
+        # The weighted count only decays as the previous bucket slides out;
+        # waiting to the next bucket boundary is the safe upper bound
+        return max(1, int(self.window_start + self.time_window - now) + 1)
 
 
 class NewsAPIConnector:
     """
     API connector for NewsAPI.ai with rate limiting and error handling
     """
-    
-    def __init__(self, api_key: str, base_url: str = "https://newsapi.ai/api/v1"):
+
+    # Responses for identical queries are stable for hours, so repeats are
+    # served from disk instead of spending a round-trip and a rate-limiter
+    # slot. TTL 0 disables the cache entirely.
+    CACHE_TTL_SECONDS = int(os.getenv('NEWSAPI_CACHE_TTL', '3600'))
+    CACHE_DIR = Path(os.getenv('NEWSAPI_CACHE_DIR', 'data/api_cache'))
+
+    def __init__(self, api_key: str, base_url: str = "https://newsapi.ai/api/v1",
+                 block_on_rate_limit: bool = True):
         self.api_key = api_key
         self.base_url = base_url
+        # Full URLs are formatted once per endpoint, not per request
+        self._endpoint_urls: Dict[str, str] = {}
         self.rate_limiter = RateLimiter()
+        # Blocking suits the sequential ETL scripts; schedulers that manage
+        # their own retries can opt into RateLimitedError instead of having
+        # a worker thread pinned for up to the whole window
+        self.block_on_rate_limit = block_on_rate_limit
+        # Serializes rate-limiter checks when search_many fans out across
+        # threads; the underlying urllib3 pool is already thread-safe
+        self._rate_lock = threading.Lock()
         self.session = requests.Session()
-        
+
+        # Retry transient upstream failures at the connection-pool level:
+        # the warm TCP/TLS session is reused across attempts and the
+        # rate-limiter slot is only claimed once for the whole sequence
+        retry = Retry(
+            total=3,
+            backoff_factor=0.5,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=frozenset(['POST']),
+            respect_retry_after_header=True
+        )
+        adapter = HTTPAdapter(max_retries=retry, pool_connections=20, pool_maxsize=20)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
         # Set default headers for JSON requests
         self.session.headers.update({
             'User-Agent': 'NewsAPI-Python-Client/1.0',
             'Content-Type': 'application/json'
         })
+
+        if self.CACHE_TTL_SECONDS > 0:
+            self.CACHE_DIR.mkdir(parents=True, exist_ok=True)
+
+    @classmethod
+    def _cache_key(cls, endpoint: str, payload: Dict[str, Any]) -> str:
+        """Digest of the request identity, excluding the API key."""
+        body = orjson.dumps({'endpoint': endpoint, 'payload': payload},
+                            option=orjson.OPT_SORT_KEYS)
+        return hashlib.blake2b(body, digest_size=16).hexdigest()
+
+    @classmethod
+    def _cache_get(cls, key: str) -> Optional[Dict[str, Any]]:
+        """Return a cached response if one exists and is fresh."""
+        if cls.CACHE_TTL_SECONDS <= 0:
+            return None
+        entry_path = cls.CACHE_DIR / f"{key}.json"
+        try:
+            if time.time() - entry_path.stat().st_mtime > cls.CACHE_TTL_SECONDS:
+                return None
+            return orjson.loads(entry_path.read_bytes())
+        except (OSError, orjson.JSONDecodeError):
+            return None
+
+    @classmethod
+    def _cache_put(cls, key: str, data: Dict[str, Any]) -> None:
+        """Store a response on disk; failures only cost the caching."""
+        if cls.CACHE_TTL_SECONDS <= 0:
+            return
+        try:
+            (cls.CACHE_DIR / f"{key}.json").write_bytes(orjson.dumps(data))
+        except OSError:
+            pass
     
     def _handle_rate_limit(self):
-        """Handle rate limiting by waiting if necessary"""
-        if not self.rate_limiter.can_make_request():
-            wait_time = self.rate_limiter.wait_time()
+        """Handle rate limiting by waiting if necessary.
+
+        Raises RateLimitedError instead of sleeping when the connector was
+        created with block_on_rate_limit=False.
+        """
+        while True:
+            with self._rate_lock:
+                if self.rate_limiter.can_make_request():
+                    # Claim the slot inside the lock so concurrent callers
+                    # can't all pass the check before any of them records
+                    self.rate_limiter.record_request()
+                    return
+                wait_time = self.rate_limiter.wait_time()
+            if not self.block_on_rate_limit:
+                raise RateLimitedError(wait_time)
             if wait_time > 0:
                 logger.warning(f"Rate limit reached. Waiting {wait_time} seconds...")
                 time.sleep(wait_time)
@@ -86,25 +205,39 @@ class NewsAPIConnector:
             requests.exceptions.RequestException: For HTTP errors
             ValueError: For API errors
         """
+        # The key is computed before apiKey is added, so the credential
+        # never participates in (or leaks into) cache state
+        cache_key = self._cache_key(endpoint, payload)
+        cached = self._cache_get(cache_key)
+        if cached is not None:
+            logger.info(f"Cache hit for {endpoint}")
+            return cached
+
         self._handle_rate_limit()
-        
-        # Add API key to payload
-        payload['apiKey'] = self.api_key
-        
-        url = f"{self.base_url}/{endpoint}"
+
+        # Add the API key on a copy so the caller's payload (which may be
+        # persisted or reused) is never mutated
+        payload = {**payload, 'apiKey': self.api_key}
+
+        url = self._endpoint_urls.get(endpoint)
+        if url is None:
+            url = self._endpoint_urls[endpoint] = f"{self.base_url}/{endpoint}"
         
         try:
             logger.info(f"Making POST request to {endpoint}")
-            logger.debug(f"Payload: {json.dumps(payload, indent=2)}")
+            # Serializing the payload is pure overhead unless DEBUG output
+            # is actually going somewhere
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"Payload: {orjson.dumps(payload, option=orjson.OPT_INDENT_2).decode()}")
             
             response = self.session.post(url, json=payload, timeout=30)
-            self.rate_limiter.record_request()
-            
+
             # Check HTTP status
             response.raise_for_status()
             
-            # Parse JSON response
-            data = response.json()
+            # Parse JSON response - orjson works on the raw bytes, skipping
+            # requests' charset detection and stdlib json's slower parser
+            data = orjson.loads(response.content)
             
             # Check API-specific errors
             if 'error' in data:
@@ -114,8 +247,15 @@ class NewsAPIConnector:
             
             articles_count = len(data.get('articles', {}).get('results', []))
             logger.info(f"Successfully retrieved {articles_count} articles")
+            self._cache_put(cache_key, data)
             return data
             
+        except requests.exceptions.RetryError:
+            # The adapter already retried with exponential backoff; this is
+            # the final failure after exhausting all attempts
+            logger.error("Retries exhausted for request")
+            raise requests.exceptions.RequestException("NewsAPI request failed after retries")
+
         except requests.exceptions.Timeout:
             logger.error("Request timed out")
             raise requests.exceptions.RequestException("Request timed out after 30 seconds")
@@ -138,7 +278,7 @@ class NewsAPIConnector:
             logger.error("Connection error")
             raise requests.exceptions.RequestException("Failed to connect to NewsAPI")
         
-        except json.JSONDecodeError:
+        except orjson.JSONDecodeError:
             logger.error("Invalid JSON response")
             raise requests.exceptions.RequestException("Invalid JSON response from API")
         
@@ -222,8 +362,108 @@ class NewsAPIConnector:
         
         
         return self._make_request('article/getArticles', payload)
-        
-        
+
+    def search_articles_batch(
+        self,
+        keywords: List[str],
+        articles_count: int = 10,
+        dateStart: Optional[str] = None,
+        dateEnd: Optional[str] = None,
+        source_location_uri: Optional[List[str]] = None,
+        data_type: Optional[List[str]] = None
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """Search several keywords in one API round-trip.
+
+        Combines the keywords with NewsAPI.ai's $or query operator, so N
+        logical searches cost one HTTP request and one rate-limiter slot
+        instead of N. Returned articles are partitioned back to their
+        keyword by matching the keyword text against title and body;
+        articles that match none land under the '_unmatched' key.
+
+        Args:
+            keywords: Search keywords to combine into one query
+            articles_count: Total number of articles to retrieve
+            dateStart: Earliest publication date (YYYY-MM-DD)
+            dateEnd: Latest publication date (YYYY-MM-DD)
+            source_location_uri: List of location URIs to filter sources
+            data_type: List of data types to include (default: ["news", "pr"])
+
+        Returns:
+            Mapping of keyword to its matched articles
+        """
+        if not keywords:
+            raise ValueError("keywords cannot be empty")
+
+        if data_type is None:
+            data_type = ["news", "pr"]
+
+        if source_location_uri is None:
+            source_location_uri = [
+                "http://en.wikipedia.org/wiki/United_States",
+                "http://en.wikipedia.org/wiki/United_Kingdom"
+            ]
+
+        conditions = [
+            {"$or": [{"keyword": keyword.strip()} for keyword in keywords]},
+            {"sourceLocationUri": {"$or": source_location_uri}},
+            {"dataType": {"$or": data_type}}
+        ]
+        if dateStart or dateEnd:
+            date_condition = {}
+            if dateStart:
+                date_condition["dateStart"] = dateStart
+            if dateEnd:
+                date_condition["dateEnd"] = dateEnd
+            conditions.append(date_condition)
+
+        payload = {
+            "action": "getArticles",
+            "query": {"$query": {"$and": conditions}},
+            "articlesCount": articles_count,
+            "articlesSortBy": "date",
+            "resultType": "articles"
+        }
+
+        data = self._make_request('article/getArticles', payload)
+        articles = data.get('articles', {}).get('results', [])
+
+        # Partition articles back to their keyword by text match
+        partitioned: Dict[str, List[Dict[str, Any]]] = {keyword: [] for keyword in keywords}
+        partitioned['_unmatched'] = []
+        lowered = [(keyword, keyword.strip().lower()) for keyword in keywords]
+        for article in articles:
+            haystack = f"{article.get('title', '')} {article.get('body', '')}".lower()
+            for keyword, needle in lowered:
+                if needle in haystack:
+                    partitioned[keyword].append(article)
+                    break
+            else:
+                partitioned['_unmatched'].append(article)
+        return partitioned
+
+    def search_many(self, keywords: List[str], max_workers: int = 8,
+                    **search_kwargs) -> List[Dict[str, Any]]:
+        """Search several keywords concurrently.
+
+        Each search is one network round-trip, so running them on a thread
+        pool overlaps the API latencies and an N-keyword fan-out finishes in
+        roughly the time of the slowest single request. The shared rate
+        limiter still bounds the total request rate across threads. Results
+        are returned in keyword order.
+
+        Args:
+            keywords: Search keywords, one request each
+            max_workers: Maximum searches in flight at once
+            **search_kwargs: Passed through to search_articles
+
+        Returns:
+            One search result dictionary per keyword, in input order
+        """
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [executor.submit(self.search_articles, keyword, **search_kwargs)
+                       for keyword in keywords]
+            return [future.result() for future in futures]
+
     def close(self):
         """Close the session"""
         self.session.close()
@@ -1,84 +1,125 @@
 from crewai import Agent
-from typing import List, Any
-from crewai_tools import SerperDevTool, ScrapeWebsiteTool
+from typing import Any, Dict, List, Tuple
+
+
+# Backstories are normalized (" ".join(....split())) once at import: the
+# indentation of the triple-quoted literals would otherwise travel into
+# every prompt as whitespace tokens.
+#
+# Agent construction triggers LLM client setup and prompt template work, so
+# identical (role, tools) combinations reuse one instance. Keyed by tool
+# identity: the executor shares its tool objects across runs, and a fresh
+# tools list naturally produces a fresh agent.
+_agent_cache: Dict[Tuple, Agent] = {}
+
+
+def _build_agent(role: str, goal: str, backstory: str, tools: List[Any],
+                 shared: bool = True) -> Agent:
+    """Create or reuse an agent for this role and tool set.
+
+    shared=False always constructs a new instance: Agent objects carry
+    mutable per-execution state (agent_executor is reassigned on each
+    task, plus crew backrefs), so crews running concurrently must each
+    get their own agents. The memoized path is for sequential runs.
+    """
+    key = (role, tuple(id(tool) for tool in tools))
+    if shared:
+        agent = _agent_cache.get(key)
+        if agent is not None:
+            return agent
+
+    agent = Agent(
+        role=role,
+        goal=goal,
+        backstory=backstory,
+        tools=tools,
+        verbose=True,
+        allow_delegation=False
+    )
+    if shared:
+        _agent_cache[key] = agent
+    return agent
 
 
 class DatabaseAgent:
     """Factory class for creating database analysis agents."""
-    
+
     AGENT_ROLE = "Database Analyst"
     AGENT_GOAL = ("Query and analyze data from PostgreSQL database to provide insights "
                   "about user reading habits and news recommendations")
-    AGENT_BACKSTORY = """I am a skilled database analyst with expertise in PostgreSQL operations. 
-    I can query user reading history, analyze article preferences, and provide data-driven insights 
-    for news recommendations. I use SQL queries to analyze user data and identify reading patterns."""
-    
+    AGENT_BACKSTORY = " ".join("""I am a skilled database analyst with expertise in PostgreSQL operations.
+    I can query user reading history, analyze article preferences, and provide data-driven insights
+    for news recommendations. I use SQL queries to analyze user data and identify reading patterns.""".split())
+
     @staticmethod
-    def create_agent(tools: List[Any]) -> Agent:
+    def create_agent(tools: List[Any], shared: bool = True) -> Agent:
         """Create a database analyst agent with given tools."""
-        return Agent(
-            role=DatabaseAgent.AGENT_ROLE,
-            goal=DatabaseAgent.AGENT_GOAL,
-            backstory=DatabaseAgent.AGENT_BACKSTORY,
-            tools=tools,
-            verbose=True,
-            allow_delegation=False
+        return _build_agent(
+            DatabaseAgent.AGENT_ROLE,
+            DatabaseAgent.AGENT_GOAL,
+            DatabaseAgent.AGENT_BACKSTORY,
+            tools,
+            shared=shared
         )
 
 
 class RecommenderAgent:
     """Factory class for creating article recommendation agents."""
-    
+
     AGENT_ROLE = "Article Recommender Specialist"
     AGENT_GOAL = ("Recommend relevant articles based on user history and preferences using "
                   "both vector similarity search and direct database queries")
-    AGENT_BACKSTORY = """I am an expert in content recommendation systems with deep knowledge 
-    of both semantic similarity search and database operations. I can analyze user interest clusters, 
-    find the most relevant articles using vector embeddings and similarity algorithms, then retrieve 
-    complete article information from databases using direct SQL queries. I combine vector search 
-    capabilities with database operations to provide comprehensive article recommendations with full 
-    metadata including titles, URLs, sources, and content previews."""
-    
+    AGENT_BACKSTORY = " ".join("""I am an expert in content recommendation systems with deep knowledge
+    of both semantic similarity search and database operations. I can analyze user interest clusters,
+    find the most relevant articles using vector embeddings and similarity algorithms, then retrieve
+    complete article information from databases using direct SQL queries. I combine vector search
+    capabilities with database operations to provide comprehensive article recommendations with full
+    metadata including titles, URLs, sources, and content previews.""".split())
+
     @staticmethod
-    def create_agent(database_tool, vector_tool) -> Agent:
+    def create_agent(database_tool, vector_tool, shared: bool = True) -> Agent:
         """Create a recommender agent with database and vector tools."""
-        tools = [database_tool, vector_tool]
-        
-        return Agent(
-            role=RecommenderAgent.AGENT_ROLE,
-            goal=RecommenderAgent.AGENT_GOAL,
-            backstory=RecommenderAgent.AGENT_BACKSTORY,
-            tools=tools,
-            verbose=True,
-            allow_delegation=False
+        return _build_agent(
+            RecommenderAgent.AGENT_ROLE,
+            RecommenderAgent.AGENT_GOAL,
+            RecommenderAgent.AGENT_BACKSTORY,
+            [database_tool, vector_tool],
+            shared=shared
         )
 
 
 class ReportWriterAgent:
     """Factory class for creating markdown report writer agents."""
-    
+
     AGENT_ROLE = "Content Report Writer"
     AGENT_GOAL = ("Create engaging, personalized markdown reports with enhanced timelines by searching "
                   "for related articles and creating chronological context")
-    AGENT_BACKSTORY = """I am a skilled content writer and report generator with expertise in creating 
-    engaging, personalized content. I specialize in transforming technical analysis and article recommendations 
-    into readable, well-structured markdown reports that highlight the most relevant and interesting content 
-    for each user. I excel at researching related stories, creating timelines, and presenting complex 
-    information in an accessible, engaging format that provides comprehensive context and value."""
-    
-    @staticmethod
-    def create_agent() -> Agent:
+    AGENT_BACKSTORY = " ".join("""I am a skilled content writer and report generator with expertise in creating
+    engaging, personalized content. I specialize in transforming technical analysis and article recommendations
+    into readable, well-structured markdown reports that highlight the most relevant and interesting content
+    for each user. I excel at researching related stories, creating timelines, and presenting complex
+    information in an accessible, engaging format that provides comprehensive context and value.""".split())
+
+    # The web tools carry no per-user state, so one pair serves every
+    # report writer
+    _WEB_TOOLS = None
+
+    @classmethod
+    def create_agent(cls, shared: bool = True) -> Agent:
         """Create a report writer agent with web search and scraping tools."""
-        tools = [
-            SerperDevTool(),  # For web searching
-            ScrapeWebsiteTool()  # For scraping article content and dates
-        ]
-        
-        return Agent(
-            role=ReportWriterAgent.AGENT_ROLE,
-            goal=ReportWriterAgent.AGENT_GOAL,
-            backstory=ReportWriterAgent.AGENT_BACKSTORY,
-            tools=tools,
-            verbose=True,
-            allow_delegation=False
-        )
\ No newline at end of file
+        if cls._WEB_TOOLS is None:
+            # Imported here so the crewai_tools package (and its heavy
+            # transitive imports) only loads when a report writer is built
+            from crewai_tools import SerperDevTool, ScrapeWebsiteTool
+            cls._WEB_TOOLS = [
+                SerperDevTool(),  # For web searching
+                ScrapeWebsiteTool()  # For scraping article content and dates
+            ]
+
+        return _build_agent(
+            cls.AGENT_ROLE,
+            cls.AGENT_GOAL,
+            cls.AGENT_BACKSTORY,
+            cls._WEB_TOOLS,
+            shared=shared
+        )
@@ -1,4 +1,5 @@
 import os
+from functools import lru_cache
 from typing import Dict
 from mcp import StdioServerParameters
 import sys
@@ -25,9 +26,15 @@ class MCPServerConfig:
         return (f"postgresql://{self.db_config.user}:{self.db_config.password}"
                 f"@{self.db_config.host}:{self.db_config.port}/{self.db_config.database}")
     
+    # Only what the npx-spawned server needs: process basics, node config,
+    # and MCP overrides. Copying all of os.environ duplicated every shell
+    # variable per config instance for nothing.
+    _ENV_PREFIXES = ('PATH', 'HOME', 'LANG', 'NODE_', 'NPM_', 'MCP_')
+
     def _setup_environment(self) -> Dict[str, str]:
         """Setup environment variables for MCP server."""
-        mcp_env = os.environ.copy()
+        mcp_env = {key: value for key, value in os.environ.items()
+                   if key.startswith(self._ENV_PREFIXES)}
         mcp_env.update({
             'DATABASE_URL': self.database_url,
             'POSTGRES_HOST': self.db_config.host,
@@ -46,6 +53,19 @@ class MCPServerConfig:
             env=self.environment
         )
     
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def get_shared() -> "MCPServerConfig":
+        """Return the process-wide MCPServerConfig instance.
+
+        The config captures a full environment copy and the server
+        parameters for a subprocess-backed MCP server; constructing one per
+        executor would hand every crew in a batch its own server setup.
+        Callers that need a non-default DatabaseConfig can still construct
+        the class directly.
+        """
+        return MCPServerConfig()
+
     @staticmethod
     def handle_mcp_error(error: Exception) -> None:
         """Handle MCP server connection errors."""
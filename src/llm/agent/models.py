@@ -1,6 +1,8 @@
-from pydantic import BaseModel
+from pathlib import Path
 from typing import Tuple, List, Dict, Any
 
+from pydantic import BaseModel
+
 
 class ClusterAnalysisOutput(BaseModel):
     """Structured output model for cluster analysis results."""
@@ -31,11 +33,9 @@ class RecommendationOutput(BaseModel):
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary format."""
-        return {
-            "cluster_1_recommendations": self.cluster_1_recommendations.dict(),
-            "cluster_2_recommendations": self.cluster_2_recommendations.dict(),
-            "cluster_3_recommendations": self.cluster_3_recommendations.dict()
-        }
+        # model_dump runs in pydantic-core (Rust); .dict() is the
+        # deprecated v1 path
+        return self.model_dump()
 
 class PersonalizedReportOutput(BaseModel):
     """Structured output model for personalized markdown report."""
@@ -45,5 +45,4 @@ class PersonalizedReportOutput(BaseModel):
     
     def save_to_file(self, file_path: str) -> None:
         """Save the markdown report to a file."""
-        with open(file_path, 'w', encoding='utf-8') as f:
-            f.write(self.markdown_report)
\ No newline at end of file
+        Path(file_path).write_text(self.markdown_report, encoding='utf-8')
\ No newline at end of file
@@ -0,0 +1,55 @@
+"""File-backed cache for generated personalized reports."""
+
+import hashlib
+import time
+from pathlib import Path
+from typing import Optional
+
+import orjson
+
+from src.llm.agent.models import PersonalizedReportOutput
+
+
+class ReportCache:
+    """Cache finished reports keyed by user email, target date and prompt fingerprint.
+
+    Re-running the pipeline for the same user and target date repeats
+    identical LLM and database work; a hit here returns the stored
+    PersonalizedReportOutput and skips the whole three-agent crew run.
+    Entries expire after a TTL so a stale report is never served once new
+    articles could change the recommendations.
+    """
+
+    DEFAULT_TTL_SECONDS = 24 * 3600
+
+    def __init__(self, cache_dir: str = "data/report_cache",
+                 ttl_seconds: int = DEFAULT_TTL_SECONDS):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.ttl_seconds = ttl_seconds
+
+    @staticmethod
+    def make_key(user_email: str, target_date, fingerprint: str = "") -> str:
+        """Build a stable cache key for one user/date/prompt combination."""
+        raw = f"{user_email}|{target_date}|{fingerprint}"
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    def _entry_path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.json"
+
+    def get(self, key: str) -> Optional[PersonalizedReportOutput]:
+        """Return the cached report for key, or None on miss/expiry."""
+        entry_path = self._entry_path(key)
+        if not entry_path.exists():
+            return None
+
+        if time.time() - entry_path.stat().st_mtime > self.ttl_seconds:
+            return None
+
+        # model_validate_json parses the bytes straight into the model with
+        # no intermediate dict pass
+        return PersonalizedReportOutput.model_validate_json(entry_path.read_bytes())
+
+    def put(self, key: str, result: PersonalizedReportOutput) -> None:
+        """Store a finished report under key."""
+        self._entry_path(key).write_bytes(orjson.dumps(result.model_dump()))
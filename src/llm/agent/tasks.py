@@ -10,101 +10,93 @@ sys.path.append(str(project_root))
 from src.db_utils.db_operations import DatabaseOperations
 
 
-class QueryTaskBuilder:
-    """Builder class for creating database query tasks."""
-    
-    def __init__(self, schema_info: str = None):
-        self.schema_info = schema_info or self._get_schema_info()
-    
-    def _get_schema_info(self) -> str:
-        """Get database schema information."""
-        db_ops = DatabaseOperations()
-        return db_ops.get_database_schema()
-    
-    def create_analysis_task(self, user_email: str, agent: Agent) -> Task:
-        """Create a user analysis task with clustering."""
-        description = f"""
-        Analyze the reading history and preferences for user with email '{user_email}'.
+# Prompt templates are module constants with placeholders; the builder
+# splices the (constant) schema into them once at construction so task
+# creation per run is a single str.format with the user email.
+#
+# The dynamic user email always goes at the END of each description: the
+# static schema/instruction block then forms a byte-identical prefix across
+# users and runs, which is what provider-side prompt caching keys on -
+# repeated calls only pay for the short dynamic tail.
+
+_ANALYSIS_TEMPLATE = """
+        Analyze the reading history and preferences for the target user named at the end of this task.
 
         DATABASE SCHEMA:
-        {self.schema_info}
-        
+        {schema_info}
+
         Your task is to:
         1. Query the database to find all articles this user has read or interacted with
         2. Analyze the user's reading patterns, topics of interest, and preferences
         3. Group the user's interests into 3 distinct clusters based on topics, themes, or content types
         4. For each cluster, write a detailed paragraph describing the user's interests in that area
-        
-        Use natural language to describe what you want to find, and let the PostgreSQL tool 
+
+        Use natural language to describe what you want to find, and let the PostgreSQL tool
         figure out the appropriate queries. For example:
-        - "Find all articles read by user with email {user_email}"
+        - "Find all articles read by the user with the target email"
         - "Get article titles and content for articles read by this user"
         - "Show me user profile information and reading statistics"
-        
+
         The database contains tables for users, articles, and user_articles (reading history).
-        
+
         Output 3 cluster descriptions as structured data.
+
+        TARGET USER EMAIL: {user_email}
         """
-        
-        return Task(
-            description=description,
-            agent=agent,
-            expected_output="A structured analysis with 3 cluster descriptions based on user reading patterns",
-            output_pydantic=ClusterAnalysisOutput
-        )
 
-    
-    def create_recommendation_task_with_context(self, agent: Agent) -> Task:
-        """Create a recommendation task that uses context from the analysis task."""
-        description = f"""
-        Based on the cluster analysis results from the previous task, recommend relevant articles by combining 
-        vector similarity search with database retrieval.
+_RECOMMENDATION_TEMPLATE = """
+        Based on the cluster analysis results from the previous task, recommend relevant articles.
 
-        IMPORTANT: Only recommend articles published for the given target date. The vector search tool 
+        IMPORTANT: Only recommend articles published for the given target date. The search tool
         automatically filters articles by date, ensuring recommendations are from prior periods only.
 
-        POSTGRESQL DATABASE SCHEMA:
-        {self.schema_info}
-
         Your task is to:
         1. Extract the 3 cluster descriptions from the previous task's output
-        2. Use the vector_similarity_search tool to find 2 most similar articles for each cluster description
-           (This tool automatically filters to articles published after the target date)
-        3. Extract the article IDs from the vector search results
-        4. Use the PostgreSQL tools to retrieve complete article information (title, url, source_uri, body) for these article IDs
-        5. Organize the recommendations by cluster with full article details
-        
-        Process for each cluster:
-        - Search for articles similar to the cluster description using vector search
-        - The vector search will only return articles published for the target date
-        - Get the article IDs from the search results
-        - Query the articles table to get complete information for these IDs
-        - Structure the final output with cluster descriptions and article details
-        
-        Use natural language queries for PostgreSQL like:
-        - "Get article details for article IDs: [list of IDs]"
-        - "Find title, url, source_uri, and body for articles with these IDs"
-        
+        2. Call the vector_search_and_hydrate tool ONCE, passing all 3 cluster descriptions
+           as a JSON array. It returns, per cluster, the 2 most similar articles with their
+           full details (id, title, url, source, body preview) already retrieved - no
+           separate database query is needed
+        3. Organize the returned recommendations by cluster
+
         Expected output format:
         - cluster_1_recommendations: cluster description + 2 articles with full details
-        - cluster_2_recommendations: cluster description + 2 articles with full details  
+        - cluster_2_recommendations: cluster description + 2 articles with full details
         - cluster_3_recommendations: cluster description + 2 articles with full details
-        
+
         Each article should include: article_id, title, url, source, body
         """
-        
-        return Task(
-            description=description,
-            agent=agent,
-            expected_output="Complete article recommendations organized by cluster with full metadata, filtered to articles published at the target date",
-            output_pydantic=RecommendationOutput
-        )
-    
-    def create_report_generation_task(self, user_email: str, agent: Agent) -> Task:
-        """Create a markdown report generation task."""
-        description = f"""
-        Create a personalized, engaging markdown report for user '{user_email}' based on the cluster analysis 
-        and article recommendations from the previous tasks.
+
+_REPORT_INTRO_TEMPLATE = """
+        Write the introduction section for a personalized news report for the target user
+        named at the end of this task.
+
+        Based on the cluster analysis from the previous task, produce:
+        - A personalized greeting
+        - A brief explanation of how the recommendation system selected content
+        - A short overview of the user's three interest areas
+
+        Output plain markdown for the '## Introduction' section only - no
+        article recommendations, those are handled by a later task.
+
+        TARGET USER EMAIL: {user_email}
+        """
+
+# One article section of the report format, repeated six times below. Kept
+# as a single constant so the mandatory format stays defined in one place
+# and the six copies are provably identical.
+_ARTICLE_SECTION = """### [Article {n} Title](article_url)
+        article_url | source | published_date
+        Article summary, main points (one paragraph)
+
+        <small>**Timeline:** (Related stories in chronological order)</small>
+        <small>1. [Connected article 1 Title](link) | Source | Date</small>
+        <small>2. [Connected article 2 Title](link) | Source | Date</small>
+        <small>3. [Current article title](original_url) | Source | Date</small>"""
+
+_REPORT_TEMPLATE = """
+        Create a personalized, engaging markdown report for the target user (email at the
+        end of this task) based on the cluster analysis and article recommendations from
+        the previous tasks.
 
         IMPORTANT CONSTRAINTS:
         - YOU MUST include EXACTLY 6 articles in the report (2 from each cluster)
@@ -136,69 +128,18 @@ class QueryTaskBuilder:
 
         MANDATORY FORMAT - Structure the report EXACTLY as follows:
         # Personalized News Recommendations for [User]
-        
+
         ## Introduction
         [Engaging intro about the recommendation system and user's interests]
-        
-        ## Recommended Articles
-        
-        ### [Article 1 Title](article_url)
-        article_url | source | published_date
-        Article summary, main points (one paragraph)
-
-        <small>**Timeline:** (Related stories in chronological order)</small>
-        <small>1. [Connected article 1 Title](link) | Source | Date</small>
-        <small>2. [Connected article 2 Title](link) | Source | Date</small>
-        <small>3. [Current article title](original_url) | Source | Date</small>
-        
-        ### [Article 2 Title](article_url)
-        article_url | source | published_date
-        Article summary, main points (one paragraph)
-
-        <small>**Timeline:** (Related stories in chronological order)</small>
-        <small>1. [Connected article 1 Title](link) | Source | Date</small>
-        <small>2. [Connected article 2 Title](link) | Source | Date</small>
-        <small>3. [Current article title](original_url) | Source | Date</small>
-
-        ### [Article 3 Title](article_url)
-        article_url | source | published_date
-        Article summary, main points (one paragraph)
-
-        <small>**Timeline:** (Related stories in chronological order)</small>
-        <small>1. [Connected article 1 Title](link) | Source | Date</small>
-        <small>2. [Connected article 2 Title](link) | Source | Date</small>
-        <small>3. [Current article title](original_url) | Source | Date</small>
-
-        ### [Article 4 Title](article_url)
-        article_url | source | published_date
-        Article summary, main points (one paragraph)
-
-        <small>**Timeline:** (Related stories in chronological order)</small>
-        <small>1. [Connected article 1 Title](link) | Source | Date</small>
-        <small>2. [Connected article 2 Title](link) | Source | Date</small>
-        <small>3. [Current article title](original_url) | Source | Date</small>
 
-        ### [Article 5 Title](article_url)
-        article_url | source | published_date
-        Article summary, main points (one paragraph)
-
-        <small>**Timeline:** (Related stories in chronological order)</small>
-        <small>1. [Connected article 1 Title](link) | Source | Date</small>
-        <small>2. [Connected article 2 Title](link) | Source | Date</small>
-        <small>3. [Current article title](original_url) | Source | Date</small>
+        ## Recommended Articles
 
-        ### [Article 6 Title](article_url)
-        article_url | source | published_date
-        Article summary, main points (one paragraph)
+        """ + "\n\n        ".join(
+            _ARTICLE_SECTION.format(n=n) for n in range(1, 7)) + """
 
-        <small>**Timeline:** (Related stories in chronological order)</small>
-        <small>1. [Connected article 1 Title](link) | Source | Date</small>
-        <small>2. [Connected article 2 Title](link) | Source | Date</small>
-        <small>3. [Current article title](original_url) | Source | Date</small>
-        
         ## Conclusion
         [Encouraging closing remarks]
-        
+
         TIMELINE FORMATTING RULES:
         - Each timeline entry MUST be on its own separate line
         - Each line starts with <small> and ends with </small>
@@ -206,19 +147,80 @@ class QueryTaskBuilder:
         - Order timeline entries chronologically (oldest to newest)
         - Include the original recommended article as the final timeline entry
         - Extract publication dates from scraped content accurately
-        
+
         ARTICLE COUNT VALIDATION:
         - Count all articles before generating the report
         - If you have fewer than 6 articles, search for additional relevant articles using web search
         - Ensure the final report contains exactly 6 article sections
         - Each article must have a complete timeline with 2-3 related stories
-        
+
         Make it personal, engaging, and valuable for the user with comprehensive context through timelines.
+
+        TARGET USER EMAIL: {user_email}
         """
-        
+
+
+class QueryTaskBuilder:
+    """Builder class for creating database query tasks."""
+
+    def __init__(self, schema_info: str = None):
+        self.schema_info = schema_info or self._get_schema_info()
+        # Specialize the constant parts of the prompts once: the schema is
+        # fixed for the builder's lifetime, leaving only the user email to
+        # splice in per task
+        self._analysis_template = _ANALYSIS_TEMPLATE.replace('{schema_info}', self.schema_info)
+        # The recommendation description is fully static: the compound
+        # search-and-hydrate tool made its schema block unnecessary
+        self._recommendation_description = _RECOMMENDATION_TEMPLATE
+
+    def _get_schema_info(self) -> str:
+        """Get database schema information for the prompts.
+
+        Uses the trimmed variant: the agents only query users, articles and
+        user_articles, so the raw-response table would just add tokens to
+        every task description.
+        """
+        db_ops = DatabaseOperations()
+        return db_ops.get_prompt_schema()
+
+    def create_analysis_task(self, user_email: str, agent: Agent) -> Task:
+        """Create a user analysis task with clustering."""
+        return Task(
+            description=self._analysis_template.format(user_email=user_email),
+            agent=agent,
+            expected_output="A structured analysis with 3 cluster descriptions based on user reading patterns",
+            output_pydantic=ClusterAnalysisOutput
+        )
+
+
+    def create_recommendation_task_with_context(self, agent: Agent) -> Task:
+        """Create a recommendation task that uses context from the analysis task."""
         return Task(
-            description=description,
+            description=self._recommendation_description,
+            agent=agent,
+            expected_output="Complete article recommendations organized by cluster with full metadata, filtered to articles published at the target date",
+            output_pydantic=RecommendationOutput
+        )
+
+    def create_report_intro_task(self, user_email: str, agent: Agent) -> Task:
+        """Create the report-introduction task.
+
+        The introduction only needs the cluster analysis, not the article
+        recommendations, so it is marked async_execution and overlaps with
+        the recommendation task instead of waiting behind it.
+        """
+        return Task(
+            description=_REPORT_INTRO_TEMPLATE.format(user_email=user_email),
+            agent=agent,
+            expected_output="A markdown introduction section for the personalized report",
+            async_execution=True
+        )
+
+    def create_report_generation_task(self, user_email: str, agent: Agent) -> Task:
+        """Create a markdown report generation task."""
+        return Task(
+            description=_REPORT_TEMPLATE.format(user_email=user_email),
             agent=agent,
             expected_output="A complete markdown report with exactly 6 personalized article recommendations, each with chronological timelines where every timeline entry is on a separate line",
             output_pydantic=PersonalizedReportOutput
-        )
\ No newline at end of file
+        )
@@ -3,16 +3,58 @@ from crewai_tools import MCPServerAdapter
 from typing import List, Any
 from datetime import date
 from psycopg2.extras import RealDictCursor
+from psycopg2.pool import ThreadedConnectionPool
+from pydantic import PrivateAttr
 from crewai.tools import BaseTool
 from src.llm.vector_store import VectorStore
 import psycopg2
+import psycopg2.errors
 
 
-from typing import List, Optional, Tuple
-import json
+import asyncio
+import hashlib
+import logging
+import logging.handlers
+import os
+import queue
+import orjson
+import re
 
 from src.llm.agent.mcp_config import MCPServerConfig
 
+# Logging from the tools happens on the agent's hot path; routing through
+# a queue makes the producer side a non-blocking enqueue while the actual
+# stderr I/O (and any container log-driver fsync) runs on the listener's
+# background thread
+logger = logging.getLogger(__name__)
+_log_queue = queue.Queue(-1)
+_log_listener = logging.handlers.QueueListener(_log_queue, logging.StreamHandler())
+_log_listener.start()
+logger.addHandler(logging.handlers.QueueHandler(_log_queue))
+logger.propagate = False
+
+# First token of a read-only statement; WITH admits the CTE-shaped queries
+# the agent frequently writes
+_READ_ONLY_RE = re.compile(r'^\s*(?:SELECT|WITH)\b', re.IGNORECASE)
+# Data-modifying keywords rejected anywhere in the statement - WITH clauses
+# can legally wrap INSERT/UPDATE/DELETE, so a prefix check alone is not enough
+_WRITE_KEYWORD_RE = re.compile(
+    r'\b(?:INSERT|UPDATE|DELETE|DROP|ALTER|TRUNCATE|CREATE|GRANT|REVOKE|COPY)\b',
+    re.IGNORECASE
+)
+
+# Same switch as db_operations: prepared statements break behind
+# transaction-mode poolers where sessions are shared
+_USE_PREPARED = os.getenv('DB_PREPARED_STATEMENTS', '1') != '0'
+
+# The agent repeats identical SELECTs within a run (schema probing, ID
+# hydration), and EXECUTE reuses the server-side plan instead of
+# re-parse/re-plan. Statement names already PREPAREd are tracked as a set
+# attribute on each connection object - the pool closes connections
+# returned beyond minconn, so an id()-keyed module dict would go stale
+# when ids get recycled.
+_MAX_PREPARED_PER_CONN = 64
+
 
 class DatabaseTool(BaseTool):
     name: str = "database_query"
@@ -23,36 +65,96 @@ class DatabaseTool(BaseTool):
     """
     # Declare as Pydantic fields
     database_url: str = None
-    
+    # One pool per tool instance: agent runs fire many small SELECTs, and
+    # each fresh connect would pay TCP+auth setup per query
+    _pool: ThreadedConnectionPool = PrivateAttr(default=None)
+
     def __init__(self, database_url: str):
         super().__init__()
         self.database_url = database_url
-    
+
+    def _get_pool(self) -> ThreadedConnectionPool:
+        """Lazily create the tool's connection pool."""
+        if self._pool is None:
+            self._pool = ThreadedConnectionPool(1, 8, dsn=self.database_url)
+        return self._pool
+
+    @staticmethod
+    def _execute_prepared(conn, cursor, sql_query: str) -> None:
+        """Execute the query through a per-connection prepared statement.
+
+        Repeated identical statements hit EXECUTE and reuse the server-side
+        plan; first sightings (or a full cache) run PREPARE, and anything
+        Postgres refuses to prepare falls back to a plain execute. Names
+        are derived from the SQL hash and tracked on the connection object
+        itself, so the bookkeeping dies with the connection.
+        """
+        if not _USE_PREPARED:
+            cursor.execute(sql_query)
+            return
+
+        prepared = getattr(conn, '_dbtool_prepared', None)
+        if prepared is None:
+            prepared = set()
+            conn._dbtool_prepared = prepared
+        name = f"dbtool_{hashlib.blake2b(sql_query.encode(), digest_size=8).hexdigest()}"
+        if name not in prepared:
+            if len(prepared) >= _MAX_PREPARED_PER_CONN:
+                cursor.execute(sql_query)
+                return
+            try:
+                cursor.execute(f"PREPARE {name} AS {sql_query}")
+                # Commit so the statement survives _run's cleanup rollback;
+                # PREPARE is transactional and would be dropped otherwise
+                conn.commit()
+            except psycopg2.errors.DuplicatePreparedStatement:
+                conn.rollback()
+            except psycopg2.Error:
+                # Not preparable (or pooler in the way) - run it directly
+                conn.rollback()
+                cursor.execute(sql_query)
+                return
+            prepared.add(name)
+        try:
+            cursor.execute(f"EXECUTE {name}")
+        except psycopg2.errors.InvalidSqlStatementName:
+            # Bookkeeping out of sync with the session (recycled conn):
+            # forget the name and run the query directly
+            conn.rollback()
+            prepared.discard(name)
+            cursor.execute(sql_query)
+
     def _run(self, sql_query: str) -> str:
         """Execute SQL query and return results."""
         try:
-            # Validate that it's a SELECT query for safety
-            query_upper = sql_query.strip().upper()
-            if not query_upper.startswith('SELECT'):
-                return "Error: Only SELECT queries are allowed for security reasons."
-            
-            with psycopg2.connect(self.database_url) as conn:
+            # Validate that it's a read-only query for safety. The compiled
+            # regexes scan once instead of uppercasing the whole statement,
+            # and SELECTs written as CTEs (WITH ... SELECT) pass the gate.
+            if not _READ_ONLY_RE.match(sql_query) or _WRITE_KEYWORD_RE.search(sql_query):
+                return "Error: Only SELECT queries (including WITH ... SELECT) are allowed for security reasons."
+
+            pool = self._get_pool()
+            conn = pool.getconn()
+            try:
                 with conn.cursor(cursor_factory=RealDictCursor) as cursor:
-                    cursor.execute(sql_query)
+                    self._execute_prepared(conn, cursor, sql_query)
                     results = cursor.fetchall()
-                    
+
                     if not results:
                         return "No results found."
-                    
+
                     # Convert to list of dictionaries for better readability
                     results_list = [dict(row) for row in results]
-                    
+
                     # Format results nicely
                     if len(results_list) == 1:
                         return f"Query result: {results_list[0]}"
                     else:
                         return f"Query results ({len(results_list)} rows): {results_list}"
-                        
+            finally:
+                conn.rollback()
+                pool.putconn(conn)
+
         except psycopg2.Error as e:
             logger.error(f"Database error: {e}")
             return f"Database error: {str(e)}"
@@ -61,44 +163,105 @@ class DatabaseTool(BaseTool):
             return f"Error executing query: {str(e)}"
 
 
-class VectorDatabaseTool(BaseTool):
-    """Tool for searching similar articles in vector database."""
-    
-    name: str = "vector_similarity_search"
+class VectorSearchHydrateTool(BaseTool):
+    """Compound tool: vector search plus article hydration in one call.
+
+    The recommendation flow used to take at least six LLM-mediated tool
+    invocations (vector search per cluster, then a SELECT per ID set).
+    This tool runs all cluster searches as one batched faiss pass and
+    hydrates every hit with a single ANY(%s) query, so the agent gets the
+    finished per-cluster article details from one call.
+    """
+
+    name: str = "vector_search_and_hydrate"
     description: str = """
-    Search for similar articles in the vector database using semantic similarity.
-    Input should be a search query (string) and it will return article IDs with similarity scores.
-    Use this tool to find articles that are semantically similar to a given topic or cluster description.
-    This tool automatically filters to only show articles published BEFORE the target date.
-    Returns a list of article IDs with their similarity scores.
+    Find and fetch recommended articles for interest clusters in ONE call.
+    Input: a JSON array of cluster description strings (pass all clusters at once).
+    For each cluster this searches the vector database for the most similar articles
+    published before the target date, then retrieves their full details
+    (id, title, url, source, body preview) from PostgreSQL.
+    Returns JSON: a list of {"cluster": ..., "articles": [...]} objects, one per input cluster.
+    No separate SQL lookup is needed afterwards.
     """
     # Declare as Pydantic fields
+    database_url: str = None
     target_date: date = None
     vector_store: VectorStore = None
-    
-    def __init__(self, target_date: date = None):
+    _pool: ThreadedConnectionPool = PrivateAttr(default=None)
+
+    def __init__(self, database_url: str, target_date: date = None):
         super().__init__()
-        self.target_date = target_date  # Default to available date
-        self.vector_store = VectorStore(self.target_date)
-    
-    def _run(self, query: str) -> str:
-        """Execute vector similarity search and return article IDs with scores."""
-        from datetime import date as date_type
-        
-        # Set date range to filter articles before target_date
-        date_range = (self.target_date, self.target_date)
-        
-        # Search for similar articles with date filtering
-        similar_articles = self.vector_store.search_similar(
-            query=query, 
-            k=2,
-            date_range=date_range
-        )
-        
-        if not similar_articles:
-            return f"No similar articles found for query: {query} before {self.target_date}"
-        
-        # Format results as simple ID list for the agent
-        article_ids = [article['id'] for article in similar_articles]
-        
-        return str(article_ids)
\ No newline at end of file
+        self.database_url = database_url
+        self.target_date = target_date
+        # Date filtering happens per search via date_range, not at store
+        # construction
+        self.vector_store = VectorStore(use_existing_version=True)
+
+    def _get_pool(self) -> ThreadedConnectionPool:
+        """Lazily create the tool's connection pool."""
+        if self._pool is None:
+            self._pool = ThreadedConnectionPool(1, 4, dsn=self.database_url)
+        return self._pool
+
+    def _hydrate(self, article_ids: List[int]) -> dict:
+        """Fetch details for all article IDs in one round trip."""
+        pool = self._get_pool()
+        conn = pool.getconn()
+        try:
+            with conn.cursor(cursor_factory=RealDictCursor) as cursor:
+                cursor.execute(
+                    "SELECT id, title, url, source_uri, LEFT(body, 500) AS body "
+                    "FROM articles WHERE id = ANY(%s)",
+                    (article_ids,)
+                )
+                return {row['id']: dict(row) for row in cursor.fetchall()}
+        finally:
+            conn.rollback()
+            pool.putconn(conn)
+
+    def _run(self, cluster_descriptions: str) -> str:
+        """Search all clusters, hydrate every hit, return JSON per cluster."""
+        try:
+            parsed = orjson.loads(cluster_descriptions)
+            clusters = parsed if isinstance(parsed, list) else [str(parsed)]
+        except (orjson.JSONDecodeError, TypeError):
+            clusters = [cluster_descriptions]
+        clusters = [str(cluster) for cluster in clusters if str(cluster).strip()]
+        if not clusters:
+            return "Error: provide at least one cluster description."
+
+        date_range = (date(2000, 1, 1), self.target_date)
+        try:
+            batch_results = self.vector_store.search_similar_batch(
+                queries=clusters, k=2, date_range=date_range
+            )
+
+            all_ids = [article['id']
+                       for results in batch_results
+                       for article in results]
+            details = self._hydrate(all_ids) if all_ids else {}
+
+            output = []
+            for cluster, results in zip(clusters, batch_results):
+                articles = []
+                for article in results:
+                    detail = details.get(article['id'])
+                    if detail is not None:
+                        articles.append({**detail,
+                                         'similarity_score': article['similarity_score']})
+                output.append({'cluster': cluster, 'articles': articles})
+            return orjson.dumps(output, option=orjson.OPT_SERIALIZE_NUMPY, default=str).decode()
+        except psycopg2.Error as e:
+            return f"Database error: {str(e)}"
+        except Exception as e:
+            return f"Error during vector search and hydration: {str(e)}"
+
+    async def _arun(self, cluster_descriptions: str) -> str:
+        """Async entry point for concurrent crews.
+
+        The embedding call and the SQL round trip are blocking I/O, so the
+        sync implementation runs in a worker thread - concurrent per-user
+        crews on one event loop keep progressing instead of stalling behind
+        each other's searches.
+        """
+        return await asyncio.to_thread(self._run, cluster_descriptions)
\ No newline at end of file
@@ -1,7 +1,8 @@
 from crewai.tools import BaseTool 
 from typing import List, Tuple
 from datetime import date
-import json
+import asyncio
+import orjson
 from src.llm.vector_store import VectorStore
 
 
@@ -11,10 +12,11 @@ class VectorDatabaseTool(BaseTool):
     name: str = "vector_similarity_search"
     description: str = """
     Search for similar articles in the vector database using semantic similarity.
-    Input should be a search query (string) and it will return article IDs with similarity scores.
+    Input should be a search query (string), or a JSON array of query strings to run
+    several searches in one call - pass all cluster descriptions at once.
     Use this tool to find articles that are semantically similar to a given topic or cluster description.
     This tool automatically filters to only show articles published BEFORE the target date.
-    Returns a list of article IDs with their similarity scores.
+    Returns a JSON array of article IDs per query.
     """
     # Declare as Pydantic fields
     target_date: date = None
@@ -23,27 +25,51 @@ class VectorDatabaseTool(BaseTool):
     def __init__(self, target_date: date = None):
         super().__init__()
         self.target_date = target_date or date(2025, 6, 20)  # Default to available date
-        self.vector_store = VectorStore(self.target_date)
+        # Date filtering happens per search via date_range, not at store
+        # construction
+        self.vector_store = VectorStore(use_existing_version=True)
     
     def _run(self, query: str) -> str:
         """Execute vector similarity search and return article IDs with scores."""
         from datetime import date as date_type
-        
+
         # Set date range to filter articles before target_date
         start_date = date_type(2000, 1, 1)  # Very early date
         date_range = (start_date, self.target_date)
-        
+
+        # Accept either one query or a JSON array of queries; a batch embeds
+        # all queries in one API call and searches the index in one pass
+        queries = [query]
+        try:
+            parsed = orjson.loads(query)
+            if isinstance(parsed, list) and all(isinstance(q, str) for q in parsed) and parsed:
+                queries = parsed
+        except (orjson.JSONDecodeError, TypeError):
+            pass
+
         # Search for similar articles with date filtering
-        similar_articles = self.vector_store.search_similar(
-            query=query, 
+        batch_results = self.vector_store.search_similar_batch(
+            queries=queries,
             k=2,
             date_range=date_range
         )
-        
-        if not similar_articles:
-            return f"No similar articles found for query: {query} before {self.target_date}"
-        
-        # Format results as simple ID list for the agent
-        article_ids = [article['id'] for article in similar_articles]
-        
-        return str(article_ids)
+
+        if len(queries) == 1:
+            similar_articles = batch_results[0]
+            if not similar_articles:
+                return f"No similar articles found for query: {query} before {self.target_date}"
+            # JSON rather than repr: the agent splices these IDs into its
+            # next SQL query, and JSON quoting stays machine-parseable
+            article_ids = [article['id'] for article in similar_articles]
+            return orjson.dumps(article_ids, option=orjson.OPT_SERIALIZE_NUMPY,
+                                default=str).decode()
+
+        return orjson.dumps(
+            {search_query: [article['id'] for article in similar_articles]
+             for search_query, similar_articles in zip(queries, batch_results)},
+            option=orjson.OPT_SERIALIZE_NUMPY, default=str
+        ).decode()
+
+    async def _arun(self, query: str) -> str:
+        """Async entry point: run the blocking search in a worker thread."""
+        return await asyncio.to_thread(self._run, query)
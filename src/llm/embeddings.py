@@ -1,22 +1,141 @@
-from openai import OpenAI
-from typing import List
-import os
+import hashlib
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from pathlib import Path
+from typing import List, Optional
+
 import numpy as np
 
+from src.llm.openai_client import get_async_openai_client, get_openai_client
+
+
+class EmbeddingCache:
+    """Content-addressable on-disk cache of embeddings.
+
+    Keys are the SHA-256 of "model:text", so a repeated text (same agent
+    query, re-indexed article body) is served from SQLite instead of a
+    fresh OpenAI round trip. Vectors are stored as raw float32 bytes.
+    """
+
+    def __init__(self, cache_path: str = "data/embedding_cache.db"):
+        path = Path(cache_path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # check_same_thread=False: each access is a single statement and
+        # sqlite serializes concurrent ones internally
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings (hash TEXT PRIMARY KEY, vec BLOB)"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(model: str, text: str) -> str:
+        return hashlib.sha256(f"{model}:{text}".encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[List[float]]:
+        row = self._conn.execute(
+            "SELECT vec FROM embeddings WHERE hash = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        return np.frombuffer(row[0], dtype=np.float32).tolist()
+
+    def put(self, key: str, embedding: List[float]) -> None:
+        self._conn.execute(
+            "INSERT OR REPLACE INTO embeddings (hash, vec) VALUES (?, ?)",
+            (key, np.asarray(embedding, dtype=np.float32).tobytes())
+        )
+        self._conn.commit()
+
 
 class EmbeddingsGenerator:
     def __init__(self):
-        self.client = OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
+        self.client = get_openai_client()
         self.embedding_dimension = 1536  # text-embedding-3-small dimension
-    
+        self.embedding_model = "text-embedding-3-small"
+        self.cache = EmbeddingCache()
+        # In-process memo in front of SQLite: agent tools embed the same
+        # query repeatedly within a run, and a hit skips even the DB lookup
+        self._cached_embed = lru_cache(maxsize=4096)(self._embed)
+
     def get_embedding(self, text: str) -> List[float]:
-        """Generate embedding for a given text using OpenAI API."""
+        """Generate embedding for a given text, cached in memory and on disk."""
         try:
-            response = self.client.embeddings.create(
+            return self._cached_embed(text)
+        except Exception as e:
+            print(f"Error generating embedding: {e}")
+            return np.zeros(self.embedding_dimension).tolist()
+
+    async def get_embedding_async(self, text: str) -> List[float]:
+        """Async variant of get_embedding for callers overlapping requests.
+
+        Uses the shared AsyncOpenAI client so gathered embedding calls run
+        concurrently on one event loop; hits the same on-disk cache.
+        """
+        key = EmbeddingCache.make_key(self.embedding_model, text)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+
+        try:
+            response = await get_async_openai_client().embeddings.create(
                 input=text,
-                model="text-embedding-3-small"
+                model=self.embedding_model
             )
-            return response.data[0].embedding
         except Exception as e:
             print(f"Error generating embedding: {e}")
-            return np.zeros(self.embedding_dimension).tolist()
\ No newline at end of file
+            return np.zeros(self.embedding_dimension).tolist()
+        embedding = response.data[0].embedding
+        self.cache.put(key, embedding)
+        return embedding
+
+    def get_embeddings_batch(self, texts: List[str], batch_size: int = 256,
+                             max_workers: int = 4) -> np.ndarray:
+        """Embed many texts with few API calls.
+
+        The embeddings endpoint accepts a list of inputs, so texts are sent
+        in chunks of batch_size instead of one request each, and the chunks
+        go out on a small thread pool - the work is network-bound and the
+        client releases the GIL during I/O. Results come back as one
+        float32 array aligned with the input order.
+        """
+        if not texts:
+            return np.empty((0, self.embedding_dimension), dtype=np.float32)
+
+        # Pack batches along length-sorted order: a request's latency tracks
+        # its longest input, so grouping similar-length texts keeps short
+        # ones from waiting behind one long outlier in the same batch
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        chunks = [order[i:i + batch_size] for i in range(0, len(order), batch_size)]
+
+        def embed_chunk(positions: List[int]) -> List[List[float]]:
+            response = self.client.embeddings.create(
+                input=[texts[i] for i in positions],
+                model=self.embedding_model
+            )
+            return [item.embedding for item in response.data]
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            results = list(executor.map(embed_chunk, chunks))
+
+        # Scatter back so rows align with the caller's input order
+        out = np.empty((len(texts), self.embedding_dimension), dtype=np.float32)
+        for positions, embeddings in zip(chunks, results):
+            out[positions] = np.asarray(embeddings, dtype=np.float32)
+        return out
+
+    def _embed(self, text: str) -> List[float]:
+        """Look up the on-disk cache, calling the OpenAI API only on a miss."""
+        key = EmbeddingCache.make_key(self.embedding_model, text)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+
+        response = self.client.embeddings.create(
+            input=text,
+            model=self.embedding_model
+        )
+        embedding = response.data[0].embedding
+        self.cache.put(key, embedding)
+        return embedding
@@ -0,0 +1,32 @@
+"""Shared OpenAI client for all outbound LLM and embedding calls."""
+
+import os
+from openai import AsyncOpenAI, OpenAI
+
+# One client per process: the SDK keeps an httpx connection pool with
+# keep-alive underneath, so sharing it means repeat calls reuse warm TLS
+# connections instead of re-handshaking per VectorStore/EmbeddingsGenerator
+# instance
+_client = None
+_async_client = None
+
+
+def get_openai_client() -> OpenAI:
+    """Return the process-wide OpenAI client, creating it on first use."""
+    global _client
+    if _client is None:
+        _client = OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
+    return _client
+
+
+def get_async_openai_client() -> AsyncOpenAI:
+    """Return the process-wide async OpenAI client, creating it on first use.
+
+    max_retries=2 keeps worst-case latency bounded for callers gathering
+    many requests concurrently.
+    """
+    global _async_client
+    if _async_client is None:
+        _async_client = AsyncOpenAI(api_key=os.getenv('OPENAI_API_KEY'),
+                                    max_retries=2)
+    return _async_client
@@ -1,15 +1,47 @@
 import os
-import json
+import math
 import pickle
+import re
 import numpy as np
+import orjson
+from concurrent.futures import ThreadPoolExecutor
+from functools import cached_property, lru_cache
 from pathlib import Path
 from datetime import datetime, date
 from typing import List, Dict, Any, Optional, Tuple
 import faiss
-from openai import OpenAI
 from dataclasses import dataclass
 
-from src.db_utils.db_config import get_db_connection
+from src.db_utils.db_config import get_db_connection, iter_rows
+from src.llm.embeddings import EmbeddingCache
+from src.llm.openai_client import get_openai_client
+
+# Some environments default faiss to a single OpenMP thread; index add and
+# batched multi-query search parallelize near-linearly across cores
+faiss.omp_set_num_threads(os.cpu_count() or 1)
+
+# Whitespace collapser for _preprocess_text, compiled once per process
+_WS_RE = re.compile(r'\s+')
+
+
+@lru_cache(maxsize=8)
+def _load_search_data(index_path: str, articles_path: str, mtime_ns: int):
+    """Load and memoize the (index, articles) pair for searching.
+
+    Process-global so every VectorStore instance (the tools create their
+    own) shares one loaded copy per index version; the mtime in the key
+    drops stale entries after a rebuild. The index is memory-mapped where
+    possible so even the first load only faults in pages a query touches.
+    """
+    try:
+        index = faiss.read_index(index_path,
+                                 faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY)
+    except Exception as e:
+        print(f"Memory-mapped read failed, loading index into RAM: {str(e)}")
+        index = faiss.read_index(index_path)
+    with open(articles_path, 'rb') as f:
+        articles = pickle.load(f)
+    return index, articles
 
 @dataclass
 class VectorMetadata:
@@ -25,12 +57,45 @@ class VectorMetadata:
 
 class VectorStore:
     """Enhanced vector store with versioning, batching, and filtering capabilities"""
-    
-    def __init__(self, batch_size: int = 50, use_existing_version: bool = True):
+
+    # Number of embedding batches kept in flight concurrently - the work is
+    # network-bound on the OpenAI API, so overlapping requests cuts wall time
+    EMBED_CONCURRENCY = 4
+
+    # Process-wide query-embedding cache shared across instances: the
+    # recommender agent re-embeds the same cluster descriptions within and
+    # across runs, and a hit replaces an API round trip with a dict lookup
+    _query_embedding_cache: Dict[str, List[float]] = {}
+    QUERY_CACHE_MAX = 4096
+
+    # Semantic result cache: cluster descriptions repeat across users and
+    # reruns with small wording changes, so near-duplicate queries (cosine
+    # similarity above the threshold) reuse the stored top-k instead of
+    # paying another index search. The embeddings are unit-normalized, so a
+    # dot product is the cosine.
+    SEMANTIC_CACHE_THRESHOLD = 0.95
+    SEMANTIC_CACHE_MAX = 256
+
+    # Per-request guards for the embeddings API: at most 2048 inputs and
+    # ~300k tokens per call; the budget leaves headroom for the rough
+    # chars/4 token estimate
+    MAX_INPUTS_PER_REQUEST = 2048
+    TOKEN_BUDGET_PER_REQUEST = 250_000
+
+    def __init__(self, batch_size: int = 256, use_existing_version: bool = True,
+                 index_type: Optional[str] = None):
         self.batch_size = batch_size
-        self.client = OpenAI()
+        self.client = get_openai_client()
         self.embedding_model = "text-embedding-3-small"
         self.embedding_dimension = 1536
+        # Shared with EmbeddingsGenerator: same sha256(model:text) keys, so
+        # index builds and agent queries reuse each other's vectors
+        self._embedding_cache = EmbeddingCache()
+        # Deployments can opt into the quantized index types (sq8 packs
+        # vectors into a quarter of the fp32 bytes, pq into ~1/32) without
+        # code changes via VECTOR_INDEX_TYPE; the default picks flat or
+        # hnsw from the corpus size at build time
+        self.index_type = index_type or os.getenv('VECTOR_INDEX_TYPE', 'auto')
         
         # Setup paths with versioning
         self.base_path = Path("data/vector_store")
@@ -42,128 +107,399 @@ class VectorStore:
             
         self.version_path = self.base_path / f"v{self.current_version}"
         self.version_path.mkdir(parents=True, exist_ok=True)
-        
+
         # File paths
         self.index_path = self.version_path / "faiss_index.bin"
         self.metadata_path = self.version_path / "metadata.json"
         self.articles_path = self.version_path / "articles.pkl"
+        # Columnar sidecars: per-article ids and dates as flat numpy arrays,
+        # so filters run as vectorized masks instead of per-dict Python loops;
+        # embeddings are kept as fp16 so filtered sub-indexes slice the file
+        # instead of reconstructing vectors from faiss one by one
+        self.ids_path = self.version_path / "ids.npy"
+        self.dates_path = self.version_path / "dates.npy"
+        self.embeddings_path = self.version_path / "embeddings.npy"
         self.version_info_path = self.base_path / "versions.json"
-    
-    def _get_latest_version(self) -> str:
-        """Get the latest existing version or create first version"""
+
+        # Date-filtered sub-indexes built during search, keyed by
+        # (index mtime, date range) - the recommender issues several queries
+        # per run against the same date slice, so rebuilding the filtered
+        # index per query would repeat the reconstruct/add work each time
+        self._filtered_index_cache: Dict[Tuple, Tuple] = {}
+
+        # Per (index mtime, date range, k) buckets of query embeddings and
+        # their search results, consulted before any index work - keying on
+        # the mtime makes an index rebuild invalidate stale entries
+        self._semantic_result_cache: Dict[Tuple, Tuple[List, List]] = {}
+
+    @cached_property
+    def versions_data(self) -> Dict:
+        """Contents of versions.json, read once per instance.
+
+        __init__, create_index and the version helpers all consult this;
+        writers mutate it in place and call _flush_versions.
+        """
         versions_file = self.base_path / "versions.json"
         if not versions_file.exists():
+            return {"versions": {}, "latest": None}
+        return orjson.loads(versions_file.read_bytes())
+
+    def _flush_versions(self):
+        """Write the cached version registry back to disk."""
+        (self.base_path / "versions.json").write_bytes(
+            orjson.dumps(self.versions_data, option=orjson.OPT_INDENT_2))
+
+    def _get_latest_version(self) -> str:
+        """Get the latest existing version or create first version"""
+        if not self.versions_data.get('versions') or not self.versions_data.get('latest'):
             return "1.0.0"
-        
-        with open(versions_file, 'r') as f:
-            versions_data = json.load(f)
-        
-        if not versions_data.get('versions') or not versions_data.get('latest'):
-            return "1.0.0"
-        
-        return versions_data['latest']
-    
+        return self.versions_data['latest']
+
     def _get_next_version(self) -> str:
         """Get next version number for the index"""
-        versions_file = self.base_path / "versions.json"
-        if not versions_file.exists():
+        if not self.versions_data.get('versions'):
             return "1.0.0"
-        
-        with open(versions_file, 'r') as f:
-            versions_data = json.load(f)
-        
-        if not versions_data.get('versions'):
-            return "1.0.0"
-        
-        latest_version = max(versions_data['versions'].keys())
+
+        latest_version = max(self.versions_data['versions'].keys())
         major, minor, patch = map(int, latest_version.split('.'))
         return f"{major}.{minor}.{patch + 1}"
-    
+
     def _save_version_info(self, metadata: VectorMetadata):
         """Save version information to versions.json"""
-        versions_file = self.base_path / "versions.json"
-        
-        if versions_file.exists():
-            with open(versions_file, 'r') as f:
-                versions_data = json.load(f)
-        else:
-            versions_data = {"versions": {}, "latest": None}
-        
-        versions_data["versions"][self.current_version] = {
+        self.versions_data["versions"][self.current_version] = {
             "created_at": metadata.created_at,
             "model_name": metadata.model_name,
             "total_articles": metadata.total_articles,
             "date_range": metadata.date_range,
             "path": str(self.version_path)
         }
-        versions_data["latest"] = self.current_version
-        
-        with open(versions_file, 'w') as f:
-            json.dump(versions_data, f, indent=2)
-    
-    def get_articles_for_date(self, date_filter: Optional[date] = None, 
-                            sources_filter: Optional[List[str]] = None) -> List[Dict]:
-        """Get articles with optional filtering by date and sources"""
+        self.versions_data["latest"] = self.current_version
+        self._flush_versions()
+
+    # Column order of the SELECT in _build_articles_query
+    ARTICLE_COLUMNS = ('id', 'title', 'body', 'url', 'source_uri', 'date')
+
+    @staticmethod
+    def _build_articles_query(date_filter: Optional[date] = None,
+                              sources_filter: Optional[List[str]] = None) -> Tuple[str, list]:
+        """Build the article SELECT with optional date and source filters"""
         query = """
             SELECT id, title, body, url, source_uri, date
-            FROM articles 
+            FROM articles
         """
         params = []
         conditions = []
-        
+
         if date_filter:
             conditions.append("DATE(date) = %s")
             params.append(date_filter)
-        
+
         if sources_filter:
             placeholders = ','.join(['%s'] * len(sources_filter))
             conditions.append(f"source_uri IN ({placeholders})")
             params.extend(sources_filter)
-        
+
         if conditions:
             query += " WHERE " + " AND ".join(conditions)
-        
+
         query += " ORDER BY date DESC"
-        
+        return query, params
+
+    def get_articles_for_date(self, date_filter: Optional[date] = None,
+                            sources_filter: Optional[List[str]] = None) -> List[Dict]:
+        """Get articles with optional filtering by date and sources"""
+        query, params = self._build_articles_query(date_filter, sources_filter)
+
         with get_db_connection() as conn:
             with conn.cursor() as cursor:
                 cursor.execute(query, params)
                 columns = [desc[0] for desc in cursor.description]
                 return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    def iter_articles_for_date(self, date_filter: Optional[date] = None,
+                               sources_filter: Optional[List[str]] = None,
+                               itersize: int = 512):
+        """Stream articles with a server-side cursor to keep memory bounded.
+
+        Yields one article dict at a time; Postgres holds the result set and
+        ships rows over in chunks of `itersize`.
+        """
+        query, params = self._build_articles_query(date_filter, sources_filter)
+
+        with get_db_connection() as conn:
+            for row in iter_rows(conn, query, params, itersize=itersize):
+                yield dict(zip(self.ARTICLE_COLUMNS, row))
     
     def _get_existing_article_ids(self) -> set:
-        """Get article IDs that already have embeddings"""
+        """Get article IDs that already have embeddings.
+
+        Prefers the memory-mapped ids.npy sidecar - a flat int64 read
+        instead of unpickling every article dict; versions saved before the
+        sidecars existed fall back to the pickle.
+        """
+        if self.ids_path.exists():
+            return set(np.load(self.ids_path, mmap_mode='r').tolist())
+
         if not self.articles_path.exists():
             return set()
-        
+
         with open(self.articles_path, 'rb') as f:
             existing_articles = pickle.load(f)
-        
+
         return set(article['id'] for article in existing_articles)
     
-    def create_embeddings_batch(self, texts: List[str]) -> List[List[float]]:
-        """Create embeddings for a batch of texts"""
-        response = self.client.embeddings.create(
-            input=texts,
-            model=self.embedding_model
-        )
-        return [embedding.embedding for embedding in response.data]
+    def create_embeddings_batch(self, texts: List[str]) -> np.ndarray:
+        """Create embeddings for a batch of texts as a float32 matrix.
 
-    
-    def _preprocess_text(self, text: str) -> str:
-        """Preprocess text for better embeddings"""
+        Texts already embedded in an earlier run are served from the shared
+        content-hash cache on disk - a rebuilt index re-embeds only articles
+        whose text actually changed. Only the misses go to the API, and
+        converting once here keeps the data numpy end-to-end; callers slice
+        rows instead of building millions of Python floats.
+        """
+        keys = [EmbeddingCache.make_key(self.embedding_model, text) for text in texts]
+        rows: List[Optional[List[float]]] = [self._embedding_cache.get(key)
+                                             for key in keys]
+
+        miss_positions = [i for i, row in enumerate(rows) if row is None]
+        if miss_positions:
+            response = self.client.embeddings.create(
+                input=[texts[i] for i in miss_positions],
+                model=self.embedding_model
+            )
+            for position, item in zip(miss_positions, response.data):
+                rows[position] = item.embedding
+                self._embedding_cache.put(keys[position], item.embedding)
+
+        return np.asarray(rows, dtype=np.float32)
+
+    def embed_query(self, text: str) -> List[float]:
+        """Embed a single query string with process-wide memoization.
+
+        Keys are whitespace-normalized and lowercased so trivially different
+        phrasings of the same query still hit. The cache is evicted FIFO
+        once it reaches QUERY_CACHE_MAX entries.
+        """
+        key = ' '.join(text.split()).lower()
+        cached = self._query_embedding_cache.get(key)
+        if cached is not None:
+            return cached
+
+        embedding = self.create_embeddings_batch([self._preprocess_text(text)])[0]
+        if len(self._query_embedding_cache) >= self.QUERY_CACHE_MAX:
+            self._query_embedding_cache.pop(next(iter(self._query_embedding_cache)))
+        self._query_embedding_cache[key] = embedding
+        return embedding
+
+    def embed_queries(self, texts: List[str]) -> List[List[float]]:
+        """Embed several query strings with one API round-trip.
+
+        Cached queries are served from the memo; only the misses go to the
+        embeddings API, together in a single call.
+        """
+        keys = [' '.join(text.split()).lower() for text in texts]
+        embeddings: List[Optional[List[float]]] = [
+            self._query_embedding_cache.get(key) for key in keys]
+
+        miss_positions = [i for i, embedding in enumerate(embeddings) if embedding is None]
+        if miss_positions:
+            fresh = self.create_embeddings_batch(
+                [self._preprocess_text(texts[i]) for i in miss_positions])
+            for position, embedding in zip(miss_positions, fresh):
+                if len(self._query_embedding_cache) >= self.QUERY_CACHE_MAX:
+                    self._query_embedding_cache.pop(next(iter(self._query_embedding_cache)))
+                self._query_embedding_cache[keys[position]] = embedding
+                embeddings[position] = embedding
+        return embeddings
+
+    # Body prefix sent to the embeddings API. The first ~500 tokens carry
+    # the topical signal retrieval needs; embedding whole multi-KB bodies
+    # mostly buys token cost and latency
+    EMBED_BODY_MAX_CHARS = 2000
+
+    def _embed_articles(self, articles: List[Dict]) -> np.ndarray:
+        """Build embedding texts for a batch of articles and embed them.
+
+        Identical texts (syndicated copies, reposts) are embedded once and
+        the vector fanned back out to every duplicate row.
+        """
+        texts = []
+        for article in articles:
+            # Use 'body' field from database, truncated to the indexed prefix
+            content = self._preprocess_text(article.get('body', ''),
+                                            max_length=self.EMBED_BODY_MAX_CHARS)
+            title = self._preprocess_text(article.get('title', ''))
+            combined_text = f"{title}\n\n{content}"
+            texts.append(combined_text)
+
+        unique_rows: Dict[str, int] = {}
+        for text in texts:
+            unique_rows.setdefault(text, len(unique_rows))
+
+        if len(unique_rows) == len(texts):
+            return self.create_embeddings_batch(texts)
+
+        unique_embeddings = self.create_embeddings_batch(list(unique_rows))
+        return unique_embeddings[[unique_rows[text] for text in texts]]
+
+
+    # Auto-mode thresholds: below the first an exhaustive flat scan beats
+    # HNSW once the graph-build cost is counted; above the second the fp32
+    # HNSW graph gets memory-heavy and IVFPQ's packed codes (d/8 bytes per
+    # vector) win at a small recall cost
+    AUTO_HNSW_MIN_VECTORS = 1024
+    AUTO_PQ_MIN_VECTORS = 10_000
+
+    def _build_index(self, embeddings: np.ndarray):
+        """Build a new FAISS index of the configured type.
+
+        Flat is exhaustive O(N) search; HNSW and IVF trade a small recall
+        loss for sub-linear queries on larger corpora. In auto mode the
+        corpus size picks between flat, hnsw and pq.
+        """
+        index_type = self.index_type
+        if index_type == "auto":
+            if len(embeddings) >= self.AUTO_PQ_MIN_VECTORS:
+                index_type = "pq"
+            elif len(embeddings) >= self.AUTO_HNSW_MIN_VECTORS:
+                index_type = "hnsw"
+            else:
+                index_type = "flat"
+
+        if index_type == "hnsw":
+            index = faiss.IndexHNSWFlat(self.embedding_dimension, 32,
+                                        faiss.METRIC_INNER_PRODUCT)
+            index.hnsw.efConstruction = 200
+        elif index_type == "ivf":
+            nlist = max(1, int(4 * math.sqrt(len(embeddings))))
+            quantizer = faiss.IndexFlatIP(self.embedding_dimension)
+            index = faiss.IndexIVFFlat(quantizer, self.embedding_dimension,
+                                       nlist, faiss.METRIC_INNER_PRODUCT)
+            index.train(embeddings)
+        elif index_type == "fp16":
+            # Half-precision storage: 2x smaller than fp32 and the search
+            # stays exhaustive, so recall is essentially unchanged
+            index = faiss.IndexScalarQuantizer(self.embedding_dimension,
+                                               faiss.ScalarQuantizer.QT_fp16,
+                                               faiss.METRIC_INNER_PRODUCT)
+            index.train(embeddings)
+        elif index_type == "sq8":
+            # 8-bit scalar quantization: 4x smaller than fp32 with near-identical recall
+            nlist = max(1, int(4 * math.sqrt(len(embeddings))))
+            quantizer = faiss.IndexFlatIP(self.embedding_dimension)
+            index = faiss.IndexIVFScalarQuantizer(quantizer, self.embedding_dimension,
+                                                  nlist, faiss.ScalarQuantizer.QT_8bit,
+                                                  faiss.METRIC_INNER_PRODUCT)
+            index.train(embeddings)
+        elif index_type == "pq":
+            # Product quantization: packs each vector into d/8 bytes (~32x smaller)
+            nlist = max(1, int(4 * math.sqrt(len(embeddings))))
+            quantizer = faiss.IndexFlatIP(self.embedding_dimension)
+            index = faiss.IndexIVFPQ(quantizer, self.embedding_dimension,
+                                     nlist, self.embedding_dimension // 8, 8,
+                                     faiss.METRIC_INNER_PRODUCT)
+            index.train(embeddings)
+        else:
+            index = faiss.IndexFlatIP(self.embedding_dimension)
+        return index
+
+    def _load_index(self, mmap: bool = True):
+        """Load the FAISS index from disk, memory-mapping it by default.
+
+        Memory-mapping shares the index pages across worker processes via
+        the OS page cache instead of duplicating the whole file in each
+        process, and only faults in the pages a query actually touches.
+        Pass mmap=False when the index will be modified and rewritten.
+        """
+        if mmap:
+            try:
+                return faiss.read_index(str(self.index_path),
+                                        faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY)
+            except Exception as e:
+                print(f"Memory-mapped read failed, loading index into RAM: {str(e)}")
+        return faiss.read_index(str(self.index_path))
+
+    @staticmethod
+    def _maybe_to_gpu(index):
+        """Move an index to GPU when a CUDA-enabled faiss build is available.
+
+        Batched k-NN searches are dominated by distance computations that GPUs
+        handle far faster than CPUs. CPU-only builds (or machines without a
+        GPU) fall through and keep using the index unchanged.
+        """
+        try:
+            if getattr(faiss, 'get_num_gpus', lambda: 0)() > 0:
+                res = faiss.StandardGpuResources()
+                return faiss.index_cpu_to_gpu(res, 0, index)
+        except Exception as e:
+            print(f"GPU index unavailable, falling back to CPU: {str(e)}")
+        return index
+
+    @staticmethod
+    def _tune_search_params(index, k: int):
+        """Set per-query recall parameters for approximate index types."""
+        if hasattr(index, 'hnsw'):
+            index.hnsw.efSearch = max(64, k * 8)
+        if hasattr(index, 'nprobe'):
+            index.nprobe = max(1, int(math.sqrt(index.nlist)))
+
+    @staticmethod
+    def _to_date(value) -> Optional[date]:
+        """Normalize a stored article date (str/datetime/date) to a date."""
+        if not value:
+            return None
+        if isinstance(value, str):
+            return datetime.fromisoformat(value.replace('Z', '+00:00')).date()
+        if hasattr(value, 'date'):
+            return value.date()
+        return value
+
+    @classmethod
+    def _dates_array(cls, articles: List[Dict]) -> np.ndarray:
+        """Build the datetime64[D] column for the dates.npy sidecar."""
+        dates = np.full(len(articles), np.datetime64('NaT'), dtype='datetime64[D]')
+        for i, article in enumerate(articles):
+            parsed = cls._to_date(article.get('date'))
+            if parsed is not None:
+                dates[i] = np.datetime64(parsed)
+        return dates
+
+    def _save_sidecars(self, articles: List[Dict]):
+        """Persist the columnar id/date arrays next to the index."""
+        np.save(self.ids_path, np.array(
+            [article.get('id', -1) for article in articles], dtype=np.int64))
+        np.save(self.dates_path, self._dates_array(articles))
+
+    def _save_embeddings_sidecar(self, new_embeddings: np.ndarray, incremental: bool):
+        """Persist all stored vectors as fp16 next to the index.
+
+        Incremental runs append the new rows to the existing sidecar; if an
+        older version has no sidecar (or row counts disagree) the file is
+        dropped and searches fall back to faiss reconstruction.
+        """
+        new_fp16 = new_embeddings.astype(np.float16)
+        if incremental and self.embeddings_path.exists():
+            existing = np.load(self.embeddings_path)
+            new_fp16 = np.concatenate([existing, new_fp16])
+        elif incremental:
+            # No sidecar to append to - leave none rather than a partial one
+            return
+        np.save(self.embeddings_path, new_fp16)
+
+    def _preprocess_text(self, text: str, max_length: int = 8000) -> str:
+        """Preprocess text for better embeddings.
+
+        The default cap is a conservative limit for text-embedding-3-small;
+        article bodies pass EMBED_BODY_MAX_CHARS to index only their prefix.
+        """
         if not text:
             return ""
-        
-        # Remove excessive whitespace
-        text = ' '.join(text.split())
-        
-        # Limit length to avoid token limits
-        max_length = 8000  # Conservative limit for text-embedding-3-small
-        if len(text) > max_length:
-            text = text[:max_length]
-        
-        return text
+
+        # Truncate first so the whitespace pass never scans text that is
+        # about to be cut anyway, then collapse runs with the precompiled
+        # regex - no intermediate token list like str.split/join builds
+        text = text[:max_length]
+        return _WS_RE.sub(' ', text).strip()
     
     def create_index(self, incremental: bool = False, force_new_version: bool = False, target_date: Optional[date] = None) -> bool:
         """Create or update vector index with batching"""
@@ -180,84 +516,123 @@ class VectorStore:
             self.index_path = self.version_path / "faiss_index.bin"
             self.metadata_path = self.version_path / "metadata.json"
             self.articles_path = self.version_path / "articles.pkl"
+            self.ids_path = self.version_path / "ids.npy"
+            self.dates_path = self.version_path / "dates.npy"
+            self.embeddings_path = self.version_path / "embeddings.npy"
             incremental = False  # Treat as full rebuild for new version
 
-        # Get articles - apply target_date filter if provided
-        if target_date:
-            articles = self.get_articles_for_date(date_filter=target_date)
-        else:
-            articles = self.get_articles_for_date()
-        
-        if not articles:
-            print(f"No articles found for the specified criteria")
-            return False
-        
-        # Handle incremental updates
-        if incremental:
-            existing_ids = self._get_existing_article_ids()
-            articles = [a for a in articles if a['id'] not in existing_ids]
-            if target_date:
-                print(f"Found {len(articles)} new articles for {target_date} for incremental update")
-            else:
-                print(f"Found {len(articles)} new articles for incremental update")
-        
-        if not articles:
-            print("No new articles to process")
-            return True
-        
+        # Skip articles that already have embeddings on incremental updates
+        existing_ids = self._get_existing_article_ids() if incremental else set()
+
         # Initialize or load existing index
         if incremental and self.index_path.exists():
             print(f"Loading existing index version {self.current_version}")
-            index = faiss.read_index(str(self.index_path))
+            # Loaded writable (no mmap) since new vectors get added and the
+            # file is rewritten at the end
+            index = self._load_index(mmap=False)
             with open(self.articles_path, 'rb') as f:
                 existing_articles = pickle.load(f)
         else:
             print(f"Creating new index version {self.current_version}")
-            # Create simple flat index
-            index = faiss.IndexFlatIP(self.embedding_dimension)
+            # Index is built after embeddings are computed since IVF-style
+            # indexes need training vectors
+            index = None
             existing_articles = []
-        
+
         # Process articles in batches
         all_embeddings = []
         processed_articles = existing_articles.copy()
+        new_article_count = 0
+
+        # Metadata aggregates, maintained as articles land instead of three
+        # separate O(N) passes (set/min/max) over processed_articles at the end
+        sources_set = set()
+        date_min = None
+        date_max = None
+
+        def track_metadata(articles_chunk):
+            nonlocal date_min, date_max
+            for tracked in articles_chunk:
+                sources_set.add(tracked.get('source_uri', 'unknown'))
+                tracked_date = tracked.get('date')
+                if tracked_date:
+                    if date_min is None or tracked_date < date_min:
+                        date_min = tracked_date
+                    if date_max is None or tracked_date > date_max:
+                        date_max = tracked_date
+
+        track_metadata(existing_articles)
+
+        print(f"Processing articles in batches of {self.batch_size}")
+
+        # Stream articles from a server-side cursor so memory stays bounded
+        # by the batch size instead of the full result set. Batches are
+        # embedded on a small thread pool so several API requests are in
+        # flight while the next rows stream in; results are collected in
+        # submission order to keep embeddings aligned with articles.
+        pending = []
+        with ThreadPoolExecutor(max_workers=self.EMBED_CONCURRENCY) as executor:
+            batch = []
+            batch_tokens = 0
+            for article in self.iter_articles_for_date(date_filter=target_date):
+                if incremental and article['id'] in existing_ids:
+                    continue
+                batch.append(article)
+                # Rough chars/4 token estimate over the text actually sent
+                batch_tokens += (len(article.get('title') or '') +
+                                 min(len(article.get('body') or ''),
+                                     self.EMBED_BODY_MAX_CHARS)) // 4
+                new_article_count += 1
+                if (len(batch) >= min(self.batch_size, self.MAX_INPUTS_PER_REQUEST)
+                        or batch_tokens >= self.TOKEN_BUDGET_PER_REQUEST):
+                    pending.append((executor.submit(self._embed_articles, batch), batch))
+                    batch = []
+                    batch_tokens = 0
+            if batch:
+                pending.append((executor.submit(self._embed_articles, batch), batch))
+
+            for batch_num, (future, batch) in enumerate(pending, start=1):
+                print(f"Processing batch {batch_num}/{len(pending)} ({len(batch)} articles)")
+                all_embeddings.append(future.result())
+                processed_articles.extend(batch)
+                track_metadata(batch)
+
+        if new_article_count == 0:
+            if incremental and existing_articles:
+                print("No new articles to process")
+                return True
+            print(f"No articles found for the specified criteria")
+            return False
         
-        print(f"Processing {len(articles)} articles in batches of {self.batch_size}")
-        
-        for i in range(0, len(articles), self.batch_size):
-            batch = articles[i:i + self.batch_size]
-            print(f"Processing batch {i // self.batch_size + 1}/{(len(articles) - 1) // self.batch_size + 1}")
-            
-            # Prepare texts for embedding
-            texts = []
-            for article in batch:
-                # Use 'body' field from database
-                content = self._preprocess_text(article.get('body', ''))
-                title = self._preprocess_text(article.get('title', ''))
-                combined_text = f"{title}\n\n{content}"
-                texts.append(combined_text)
-            
-            # Create embeddings for batch
-            batch_embeddings = self.create_embeddings_batch(texts)
-            all_embeddings.extend(batch_embeddings)
-            processed_articles.extend(batch)
-        
-        # Convert embeddings to numpy array and add to index
+        # Stack batch matrices and add to index - each batch is already a
+        # contiguous float32 array, so this is one concatenation, not a
+        # per-row Python conversion
         if all_embeddings:
-            embeddings_array = np.array(all_embeddings, dtype=np.float32)
+            embeddings_array = np.vstack(all_embeddings)
+            # Unit-normalize so inner product equals cosine similarity -
+            # required for correct ranking on every index type here
+            faiss.normalize_L2(embeddings_array)
+            if index is None:
+                index = self._build_index(embeddings_array)
             index.add(embeddings_array)
+
+        if index is None:
+            print("No embeddings to index")
+            return False
         
         # Save index and metadata
         faiss.write_index(index, str(self.index_path))
         
         with open(self.articles_path, 'wb') as f:
             pickle.dump(processed_articles, f)
-        
-        # Create and save metadata
-        sources = list(set(article.get('source_uri', 'unknown') for article in processed_articles))
-        dates = [article.get('date') for article in processed_articles if article.get('date')]
+        self._save_sidecars(processed_articles)
+        self._save_embeddings_sidecar(embeddings_array, incremental)
+
+        # Create and save metadata from the running aggregates
+        sources = sorted(sources_set)
         date_range = {
-            'start': str(min(dates).date() if hasattr(min(dates), 'date') else min(dates)) if dates else 'unknown',
-            'end': str(max(dates).date() if hasattr(max(dates), 'date') else max(dates)) if dates else 'unknown'
+            'start': str(date_min.date() if hasattr(date_min, 'date') else date_min) if date_min else 'unknown',
+            'end': str(date_max.date() if hasattr(date_max, 'date') else date_max) if date_max else 'unknown'
         }
         
         metadata = VectorMetadata(
@@ -271,8 +646,8 @@ class VectorStore:
             sources=sources
         )
         
-        with open(self.metadata_path, 'w') as f:
-            json.dump(metadata.__dict__, f, indent=2)
+        self.metadata_path.write_bytes(
+            orjson.dumps(metadata.__dict__, option=orjson.OPT_INDENT_2))
         
         # Only save version info for new versions or full rebuilds
         if force_new_version or not incremental:
@@ -286,79 +661,173 @@ class VectorStore:
         
         return True
     
-    def search_similar(self, query: str, k: int = 5, 
+    def _resolve_search_slice(self, date_range: Optional[Tuple[date, date]]):
+        """Return the (index, articles) pair to search for this date range.
+
+        Without a range the full index is used; with one, a filtered
+        sub-index is built and cached per (index mtime, range) so repeat
+        queries against the same date slice reuse it.
+        """
+        index, articles = _load_search_data(str(self.index_path),
+                                            str(self.articles_path),
+                                            self.index_path.stat().st_mtime_ns)
+
+        if not date_range:
+            return index, articles
+
+        cache_key = (self.index_path.stat().st_mtime_ns, date_range)
+        cached = self._filtered_index_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        # Vectorized mask over the dates sidecar; older versions saved
+        # before the sidecars existed fall back to the per-article loop
+        dates = None
+        if self.dates_path.exists():
+            dates = np.load(self.dates_path, mmap_mode='r')
+            if len(dates) != len(articles):
+                dates = None
+
+        if dates is not None:
+            mask = (dates >= np.datetime64(date_range[0])) & \
+                   (dates <= np.datetime64(date_range[1]))
+            filtered_indices = np.nonzero(mask)[0].tolist()
+            filtered_articles = [articles[idx] for idx in filtered_indices]
+        else:
+            filtered_articles = []
+            filtered_indices = []
+            for idx, article in enumerate(articles):
+                article_date = self._to_date(article.get('date'))
+                if article_date and date_range[0] <= article_date <= date_range[1]:
+                    filtered_articles.append(article)
+                    filtered_indices.append(idx)
+
+        if not filtered_articles:
+            self._filtered_index_cache[cache_key] = (None, [])
+            return None, []
+
+        # Create filtered index: slice the fp16 sidecar where available,
+        # otherwise reconstruct the vectors from faiss
+        filtered_matrix = None
+        if self.embeddings_path.exists():
+            stored = np.load(self.embeddings_path, mmap_mode='r')
+            if len(stored) == len(articles):
+                filtered_matrix = np.asarray(stored[filtered_indices], dtype=np.float32)
+        if filtered_matrix is None:
+            if hasattr(index, 'make_direct_map'):
+                index.make_direct_map()
+            filtered_matrix = np.array([index.reconstruct(idx) for idx in filtered_indices],
+                                       dtype=np.float32)
+        filtered_index = faiss.IndexFlatIP(self.embedding_dimension)
+        filtered_index.add(filtered_matrix)
+
+        self._filtered_index_cache[cache_key] = (filtered_index, filtered_articles)
+        return filtered_index, filtered_articles
+
+    def search_similar(self, query: str, k: int = 5,
                       date_range: Optional[Tuple[date, date]] = None) -> List[Dict]:
         """Search for similar articles with optional date filtering"""
-        # Load index and articles
+        return self.search_similar_batch([query], k=k, date_range=date_range)[0]
+
+    def search_similar_batch(self, queries: List[str], k: int = 5,
+                             date_range: Optional[Tuple[date, date]] = None) -> List[List[Dict]]:
+        """Search several queries against one index pass.
+
+        All queries share one embeddings API round-trip and one stacked
+        faiss search, so the per-call costs (network, index setup, GPU
+        transfer) are paid once instead of once per query. Returns one
+        result list per query, in input order.
+        """
         if not self.index_path.exists():
             print("Vector index not found")
-            return []
-        
-        index = faiss.read_index(str(self.index_path))
-        with open(self.articles_path, 'rb') as f:
-            articles = pickle.load(f)
-        
-        # Filter articles by date if specified
-        if date_range:
-            filtered_articles = []
-            filtered_indices = []
-            
-            for idx, article in enumerate(articles):
-                article_date = article.get('date')
-                if article_date:
-                    if isinstance(article_date, str):
-                        article_date = datetime.fromisoformat(article_date.replace('Z', '+00:00')).date()
-                    elif hasattr(article_date, 'date'):
-                        article_date = article_date.date()
-                    
-                    if date_range[0] <= article_date <= date_range[1]:
-                        filtered_articles.append(article)
-                        filtered_indices.append(idx)
-            
-            if not filtered_articles:
-                return []
-            
-            # Create filtered index
-            filtered_embeddings = [index.reconstruct(idx) for idx in filtered_indices]
-            filtered_index = faiss.IndexFlatIP(self.embedding_dimension)
-            filtered_index.add(np.array(filtered_embeddings, dtype=np.float32))
-            
-            search_index = filtered_index
-            search_articles = filtered_articles
-        else:
-            search_index = index
-            search_articles = articles
-    
-        # Create query embedding and search
-        query_embedding = self.create_embeddings_batch([self._preprocess_text(query)])[0]
-        query_vector = np.array([query_embedding], dtype=np.float32)
-    
-        scores, indices = search_index.search(query_vector, min(k, len(search_articles)))
-    
-        # Build results
-        results = []
-        for score, idx in zip(scores[0], indices[0]):
-            if idx < len(search_articles):
-                results.append({
-                    **search_articles[idx],
-                    'similarity_score': float(score)
-                })
-    
-        return results
+            return [[] for _ in queries]
+
+        # Create query embeddings (memoized, one API call); the embedding-
+        # level search handles caching and the index pass
+        query_embeddings = np.array(self.embed_queries(queries), dtype=np.float32)
+        return self.search_by_embeddings(query_embeddings, k=k, date_range=date_range)
+
+    def search_by_embedding(self, embedding, k: int = 5,
+                            date_range: Optional[Tuple[date, date]] = None) -> List[Dict]:
+        """Search with a pre-computed query embedding.
+
+        Entry point for callers that already hold the vector (e.g. a tool
+        that embedded the query for its own bookkeeping) so it is never
+        computed twice.
+        """
+        matrix = np.asarray([embedding], dtype=np.float32)
+        return self.search_by_embeddings(matrix, k=k, date_range=date_range)[0]
+
+    def search_by_embeddings(self, query_embeddings: np.ndarray, k: int = 5,
+                             date_range: Optional[Tuple[date, date]] = None) -> List[List[Dict]]:
+        """Search a matrix of query embeddings against one index pass.
+
+        Consults the semantic cache first: a near-duplicate of an earlier
+        query in the same (index version, date slice, k) bucket reuses its
+        stored results; only misses touch the index.
+        """
+        if not self.index_path.exists():
+            print("Vector index not found")
+            return [[] for _ in range(len(query_embeddings))]
+
+        query_embeddings = np.ascontiguousarray(query_embeddings, dtype=np.float32)
+        # Match the unit-normalized stored vectors so scores are cosines
+        faiss.normalize_L2(query_embeddings)
+        n_queries = len(query_embeddings)
+        bucket_key = (self.index_path.stat().st_mtime_ns, date_range, k)
+        cached_embeddings, cached_results = self._semantic_result_cache.setdefault(
+            bucket_key, ([], []))
+
+        all_results: List[Optional[List[Dict]]] = [None] * n_queries
+        miss_positions = list(range(n_queries))
+        if cached_embeddings:
+            similarities = np.array(cached_embeddings, dtype=np.float32) @ query_embeddings.T
+            miss_positions = []
+            for position in range(n_queries):
+                best = int(np.argmax(similarities[:, position]))
+                if similarities[best, position] >= self.SEMANTIC_CACHE_THRESHOLD:
+                    all_results[position] = cached_results[best]
+                else:
+                    miss_positions.append(position)
+
+        if miss_positions:
+            search_index, search_articles = self._resolve_search_slice(date_range)
+            if not search_articles:
+                return [results if results is not None else []
+                        for results in all_results]
+
+            query_matrix = query_embeddings[miss_positions]
+            self._tune_search_params(search_index, k)
+            search_index = self._maybe_to_gpu(search_index)
+            scores, indices = search_index.search(query_matrix, min(k, len(search_articles)))
+
+            # Build results per missed query and remember them for
+            # near-duplicate queries later
+            for position, query_scores, query_indices in zip(miss_positions, scores, indices):
+                results = []
+                for score, idx in zip(query_scores, query_indices):
+                    if 0 <= idx < len(search_articles):
+                        results.append({
+                            **search_articles[idx],
+                            'similarity_score': float(score)
+                        })
+                if len(cached_embeddings) >= self.SEMANTIC_CACHE_MAX:
+                    cached_embeddings.pop(0)
+                    cached_results.pop(0)
+                cached_embeddings.append(query_embeddings[position])
+                cached_results.append(results)
+                all_results[position] = results
+
+        return all_results
             
     
     def get_available_versions(self) -> Dict:
         """Get information about available index versions"""
-        versions_file = self.base_path / "versions.json"
-        if not versions_file.exists():
-            return {"versions": {}, "latest": None}
-        
-        with open(versions_file, 'r') as f:
-            return json.load(f)
-    
+        return self.versions_data
+
     def cleanup_old_versions(self, keep_latest_n: int = 3):
         """Clean up old versions, keeping only the latest N"""
-        versions_info = self.get_available_versions()
+        versions_info = self.versions_data
         versions = list(versions_info.get("versions", {}).keys())
         
         if len(versions) <= keep_latest_n:
@@ -376,7 +845,6 @@ class VectorStore:
                 print(f"Removed old version: {version}")
             
             del versions_info["versions"][version]
-        
+
         # Update versions file
-        with open(self.base_path / "versions.json", 'w') as f:
-            json.dump(versions_info, f, indent=2)
\ No newline at end of file
+        self._flush_versions()
\ No newline at end of file